@@ -0,0 +1,123 @@
+import hashlib
+import time
+import traceback
+from collections import OrderedDict, deque
+from typing import Optional
+
+
+class ErrorGroup:
+    """
+    All occurrences of one fingerprint: a counter plus a few sampled tracebacks.
+    """
+    __slots__ = ("fingerprint", "type", "message", "count", "first_seen", "last_seen",
+                 "samples", "window_start", "window_captured")
+
+    def __init__(self, fingerprint: str, exc: BaseException, now: float, samples: int):
+        self.fingerprint = fingerprint
+        self.type = type(exc).__qualname__
+        self.message = str(exc)
+        self.count = 0
+        self.first_seen = now
+        self.last_seen = now
+        self.samples: deque[str] = deque(maxlen=samples)
+        self.window_start = now
+        self.window_captured = 0
+
+    def summary(self) -> dict:
+        return {
+            "fingerprint": self.fingerprint,
+            "type": self.type,
+            "message": self.message,
+            "count": self.count,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "samples": list(self.samples),
+        }
+
+
+def fingerprint(exc: BaseException) -> str:
+    """
+    Identify an exception by its type and the (file, function) of every frame it passed.
+
+    Line numbers and messages are left out, so the same bug keeps one fingerprint across
+    different inputs and small edits. Walking `tb_next` is cheap; nothing is formatted.
+    """
+    parts = [type(exc).__module__, type(exc).__qualname__]
+    tb = exc.__traceback__
+    while tb is not None:
+        code = tb.tb_frame.f_code
+        parts.append(f"{code.co_filename}:{code.co_name}")
+        tb = tb.tb_next
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=8).hexdigest()
+
+
+class ErrorAggregator:
+    """
+    Bounded table of unhandled errors grouped by fingerprint.
+
+    Every error costs a fingerprint and a counter bump. The full formatted traceback, the
+    expensive part, is only captured for the first `samples_per_window` occurrences of
+    a fingerprint in each `window` seconds, so an error storm does not turn traceback
+    formatting into the hot path. When the table is full the least recently seen group
+    is evicted.
+
+    Attributes:
+        max_groups (int): Maximum number of fingerprints tracked.
+        samples_per_window (int): Tracebacks captured per fingerprint per window.
+        window (float): Sampling window in seconds.
+        total (int): Errors recorded, including those of evicted groups.
+        evicted (int): Groups dropped to stay within `max_groups`.
+    """
+
+    def __init__(self, max_groups: int = 256, samples_per_window: int = 3, window: float = 60):
+        self.max_groups = max_groups
+        self.samples_per_window = samples_per_window
+        self.window = window
+        self.total = 0
+        self.evicted = 0
+        self._groups: OrderedDict[str, ErrorGroup] = OrderedDict()
+
+    def record(self, exc: BaseException) -> tuple[ErrorGroup, Optional[str]]:
+        """
+        Count an exception and capture its traceback if its group is still under quota.
+
+        Returns:
+            tuple[ErrorGroup, Optional[str]]: The group, and the formatted traceback when
+            this occurrence was sampled (None otherwise).
+        """
+        now = time.time()
+        key = fingerprint(exc)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = ErrorGroup(key, exc, now, self.samples_per_window)
+            if len(self._groups) > self.max_groups:
+                self._groups.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._groups.move_to_end(key)
+
+        self.total += 1
+        group.count += 1
+        group.last_seen = now
+
+        if now - group.window_start >= self.window:
+            group.window_start = now
+            group.window_captured = 0
+        if group.window_captured >= self.samples_per_window:
+            return group, None
+
+        group.window_captured += 1
+        tb = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+        group.samples.append(tb)
+        return group, tb
+
+    def summary(self) -> dict:
+        """
+        Every tracked group, most frequent first.
+        """
+        groups = sorted(self._groups.values(), key=lambda group: group.count, reverse=True)
+        return {
+            "total": self.total,
+            "evicted": self.evicted,
+            "groups": [group.summary() for group in groups],
+        }
@@ -1,9 +1,13 @@
 from fastapi import FastAPI
-from fastapi import Request, status, Header
+from fastapi import Request, status, Header, Depends
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from pydantic import BaseModel
-import traceback
+from error_aggregator import ErrorAggregator
+from ratelimit import (Algorithm, Decision, RateLimiter, RateLimitMiddleware, ResourceLimitError,
+                       SharedRateLimiter, TokenBucket, rate_limit)
+import math
+import os
 import jwt
 import logging
 
@@ -21,6 +25,20 @@ import logging
 
 app = FastAPI()
 
+
+def create_limiter(name: str, algorithm: Algorithm):
+    """
+    In-process limiter, or with RATELIMIT_BACKEND=shared one whose table is shared by all
+    workers on the host, so `--workers N` does not multiply the limit by N.
+    """
+    if os.getenv("RATELIMIT_BACKEND", "memory") == "shared":
+        return SharedRateLimiter(algorithm, name=name)
+    return RateLimiter(algorithm)
+
+
+# Coarse per-IP limit on every request, enforced before routing
+app.add_middleware(RateLimitMiddleware, limiter=create_limiter("requests", TokenBucket(rate=50, capacity=100)))
+
 # Sample user database
 users = {
     1: "Alice",
@@ -62,13 +80,15 @@ async def authenticate_user(request: Request, user_id: int):
 # -------------------------------
 # Custom Exception: Resource Limit
 # -------------------------------
-class ResourceLimitError(Exception):
+# Every client gets 10 requests per minute per resource, refilled continuously
+resource_limiter = create_limiter("resources", TokenBucket(rate=10 / 60, capacity=10))
+
+
+def requested_resource(request: Request) -> str:
     """
-    Raised when access to a resource exceeds the allowed limit.
+    The `?resource=` value, so each resource has its own quota and is named in the 429.
     """
-    def __init__(self, resource: str, limit: int):
-        self.resource = resource
-        self.limit = limit
+    return request.query_params.get("resource", "")
 
 @app.exception_handler(ResourceLimitError)
 async def limit_exceeded_handler(request: Request, exc: ResourceLimitError):
@@ -83,15 +103,15 @@ async def limit_exceeded_handler(request: Request, exc: ResourceLimitError):
             "limit": exc.limit,
             "message": f"Limit exceeded for {exc.resource}. Max allowed: {exc.limit}"
         },
-        headers={"Retry-After": "60"}
+        headers={"Retry-After": str(math.ceil(exc.retry_after))}
     )
 
 @app.get("/api/resource")
-async def get_resource(resource: str):
+async def get_resource(resource: str, decision: Decision = Depends(rate_limit(resource_limiter, resource=requested_resource))):
     """
-    Always raises ResourceLimitError for demonstration.
+    Rate-limited resource. Raises ResourceLimitError once the client's quota is spent.
     """
-    raise ResourceLimitError(resource, 10)
+    return {"resource": resource, "remaining": decision.remaining}
 
 
 # -----------------------------------------
@@ -100,6 +120,9 @@ async def get_resource(resource: str):
 logger = logging.getLogger("fastapi")
 logging.basicConfig(level=logging.ERROR)
 
+# Unhandled errors grouped by fingerprint; every one is logged, but only a few tracebacks per group are formatted
+errors = ErrorAggregator(max_groups=256, samples_per_window=3, window=60)
+
 @app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: Exception):
     """
@@ -112,14 +135,25 @@ async def generic_exception_handler(request: Request, exc: Exception):
     Returns:
         JSONResponse: 500 Internal Server Error response.
     """
-    tb_str = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
-    
-    logger.error(f"Unhandled error: {exc} from {request.url}")
+    group, tb_str = errors.record(exc)
+    # One line per error keeps every occurrence visible; only sampled ones carry the traceback
+    line = f"Unhandled error [{group.fingerprint}] #{group.count}: {exc!r} from {request.url}"
+    logger.error(f"{line}\n{tb_str}" if tb_str is not None else line)
     return JSONResponse(
         status_code=500,
         content={"error": "InternalServerError", "message": "Something went wrong."}
     )
 
+@app.get("/api/errors")
+async def error_summary():
+    """
+    Summary of unhandled errors since startup.
+
+    Returns:
+        dict: Total count and one entry per fingerprint with its count and sampled tracebacks.
+    """
+    return errors.summary()
+
 @app.get("/api/cause-error")
 async def cause_error():
     """
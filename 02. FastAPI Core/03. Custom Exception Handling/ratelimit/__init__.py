@@ -0,0 +1,22 @@
+from .algorithms import Algorithm, Decision, FixedWindow, LeakyBucket, SlidingWindow, TokenBucket
+from .dependencies import rate_limit
+from .errors import ResourceLimitError
+from .limiter import RateLimiter
+from .middleware import RateLimitMiddleware, client_key, rate_limit_headers
+from .shared import SharedRateLimiter
+
+__all__ = [
+    "Algorithm",
+    "Decision",
+    "FixedWindow",
+    "LeakyBucket",
+    "RateLimitMiddleware",
+    "RateLimiter",
+    "ResourceLimitError",
+    "SharedRateLimiter",
+    "SlidingWindow",
+    "TokenBucket",
+    "client_key",
+    "rate_limit",
+    "rate_limit_headers",
+]
@@ -0,0 +1,203 @@
+import math
+from abc import ABC, abstractmethod
+from typing import MutableSequence, NamedTuple
+
+# Per-key state is a short run of floats (an `array('d')` in memory, or a slice of a
+# shared table), so every algorithm below works unchanged on any storage backend.
+State = MutableSequence[float]
+
+
+class Decision(NamedTuple):
+    """
+    Outcome of one rate-limit check.
+
+    Attributes:
+        allowed (bool): Whether the request may proceed.
+        limit (int): Configured maximum (requests per window, or bucket capacity).
+        remaining (int): Requests still allowed right now.
+        retry_after (float): Seconds until a denied request would be allowed (0 if allowed,
+            `math.inf` if its cost exceeds the limit, so it never will be).
+        reset_after (float): Seconds until the key is back to its full quota.
+    """
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+    reset_after: float
+
+
+class Algorithm(ABC):
+    """
+    A rate-limit policy. Holds only configuration; per-key state is passed in.
+
+    Subclasses define the state layout (`size` floats, initialised by `initial`), update
+    it in `decide`, and report in `expires_at` when a state has become equivalent to a
+    fresh one, which is when a store may evict the key without changing any decision.
+    A request whose cost exceeds `limit` is always denied with `retry_after=math.inf`.
+    """
+    size = 0
+    limit = 0
+
+    @abstractmethod
+    def initial(self, now: float) -> list[float]:
+        ...
+
+    @abstractmethod
+    def decide(self, state: State, now: float, cost: int = 1) -> Decision:
+        ...
+
+    @abstractmethod
+    def expires_at(self, state: State) -> float:
+        ...
+
+
+class FixedWindow(Algorithm):
+    """
+    Counts requests per aligned window; the count resets when a new window starts.
+
+    State: [window_index, count]. The window is stored as its integer index
+    (`now // window`) rather than its float start, because float starts computed from
+    different `now` values need not compare equal when `window` is not a binary fraction.
+    """
+    size = 2
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+
+    def initial(self, now: float) -> list[float]:
+        return [now // self.window, 0.0]
+
+    def decide(self, state: State, now: float, cost: int = 1) -> Decision:
+        index = now // self.window
+        if state[0] != index:
+            state[0], state[1] = index, 0.0
+
+        reset_after = (index + 1) * self.window - now
+        if state[1] + cost > self.limit:
+            retry_after = math.inf if cost > self.limit else reset_after
+            return Decision(False, self.limit, max(0, int(self.limit - state[1])), retry_after, reset_after)
+
+        state[1] += cost
+        return Decision(True, self.limit, int(self.limit - state[1]), 0.0, reset_after)
+
+    def expires_at(self, state: State) -> float:
+        return (state[0] + 1) * self.window
+
+
+class SlidingWindow(Algorithm):
+    """
+    Sliding-window counter: the previous window's count is weighted by how much of it
+    still overlaps the rolling window. Smooths the bursts a fixed window allows at its
+    edges while keeping two counters instead of a log of timestamps.
+
+    State: [window_index, count, previous_count], with the window as an integer index
+    like `FixedWindow`, so "exactly one window later" is an exact comparison.
+    """
+    size = 3
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+
+    def initial(self, now: float) -> list[float]:
+        return [now // self.window, 0.0, 0.0]
+
+    def decide(self, state: State, now: float, cost: int = 1) -> Decision:
+        window = self.window
+        index = now // window
+        start = index * window
+        if state[0] != index:
+            # One window later the current count becomes the previous one; later still, both reset
+            state[2] = state[1] if index - state[0] == 1 else 0.0
+            state[0], state[1] = index, 0.0
+
+        weight = 1 - (now - start) / window
+        used = state[2] * weight + state[1]
+        if used + cost > self.limit:
+            if cost > self.limit:
+                retry_after = math.inf
+            elif state[2] and state[1] + cost <= self.limit:
+                # Wait until enough of the previous window has slid out
+                retry_after = (1 - (self.limit - state[1] - cost) / state[2]) * window - (now - start)
+            else:
+                # Wait for the next window, then until this window's count has slid out enough
+                retry_after = start + window - now + max(0.0, (1 - (self.limit - cost) / state[1]) * window)
+            return Decision(False, self.limit, max(0, int(self.limit - used)), max(0.0, retry_after),
+                            start + 2 * window - now)
+
+        state[1] += cost
+        return Decision(True, self.limit, int(self.limit - used - cost), 0.0, start + 2 * window - now)
+
+    def expires_at(self, state: State) -> float:
+        return (state[0] + 2) * self.window
+
+
+class TokenBucket(Algorithm):
+    """
+    Bucket of `capacity` tokens refilled at `rate` per second; each request takes `cost`.
+    Refill is computed lazily from the elapsed time, so idle keys cost nothing.
+
+    State: [tokens, updated_at]
+    """
+    size = 2
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.limit = capacity
+
+    def initial(self, now: float) -> list[float]:
+        return [float(self.capacity), now]
+
+    def decide(self, state: State, now: float, cost: int = 1) -> Decision:
+        tokens = min(self.capacity, state[0] + (now - state[1]) * self.rate)
+        state[1] = now
+        if tokens < cost:
+            state[0] = tokens
+            retry_after = math.inf if cost > self.capacity else (cost - tokens) / self.rate
+            return Decision(False, self.capacity, int(tokens), retry_after, (self.capacity - tokens) / self.rate)
+
+        state[0] = tokens = tokens - cost
+        return Decision(True, self.capacity, int(tokens), 0.0, (self.capacity - tokens) / self.rate)
+
+    def expires_at(self, state: State) -> float:
+        return state[1] + (self.capacity - state[0]) / self.rate
+
+
+class LeakyBucket(Algorithm):
+    """
+    Leaky bucket as a meter (GCRA): requests drain at `rate` per second and at most
+    `capacity` may be queued ahead of the drain. Unlike the token bucket it tracks a
+    single timestamp, the theoretical arrival time of the next conforming request.
+
+    State: [tat]
+    """
+    size = 1
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.limit = capacity
+        self.interval = 1 / rate
+        self.burst = capacity * self.interval
+
+    def initial(self, now: float) -> list[float]:
+        return [now]
+
+    def decide(self, state: State, now: float, cost: int = 1) -> Decision:
+        tat = max(state[0], now)
+        new_tat = tat + cost * self.interval
+        allow_at = new_tat - self.burst
+        # Tolerance for float drift from summing intervals, so a full burst is admitted
+        if allow_at - now > 1e-9:
+            remaining = max(0, math.floor((self.burst - (tat - now)) / self.interval + 1e-9))
+            retry_after = math.inf if cost > self.capacity else allow_at - now
+            return Decision(False, self.capacity, remaining, retry_after, tat - now)
+
+        state[0] = new_tat
+        remaining = max(0, math.floor((self.burst - (new_tat - now)) / self.interval + 1e-9))
+        return Decision(True, self.capacity, remaining, 0.0, new_tat - now)
+
+    def expires_at(self, state: State) -> float:
+        return state[0]
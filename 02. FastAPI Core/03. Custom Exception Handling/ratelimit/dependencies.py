@@ -0,0 +1,43 @@
+from typing import Callable, Optional, Union
+
+from fastapi import Request
+
+from .algorithms import Decision
+from .errors import ResourceLimitError
+from .limiter import RateLimiter
+from .middleware import KeyFunc, client_key
+
+
+def rate_limit(limiter: RateLimiter, resource: Union[str, Callable[[Request], str], None] = None,
+               cost: int = 1, key_func: KeyFunc = client_key):
+    """
+    Build a dependency that charges `cost` against `limiter` for every call of a route.
+
+    Keys are (client key, resource), so one limiter can guard several routes separately.
+
+    Args:
+        limiter (RateLimiter): Limiter to consult.
+        resource (str | Callable[[Request], str] | None): Resource part of the key and the
+            name reported in errors. A callable derives it from the request (e.g. a query
+            parameter); defaults to the request path.
+        cost (int): Units charged per request.
+        key_func (KeyFunc): Maps the ASGI scope to the client part of the key.
+
+    Returns:
+        Callable: Dependency returning the `Decision`, or raising `ResourceLimitError`
+        with the exact wait in `retry_after` when the limit is hit.
+
+    Raises:
+        ValueError: If `cost` exceeds the limiter's limit, since no request could pass.
+    """
+    if cost > limiter.limit:
+        raise ValueError(f"cost {cost} exceeds the limit of {limiter.limit}; every request would be denied")
+
+    async def dependency(request: Request) -> Decision:
+        name = resource(request) if callable(resource) else resource or request.url.path
+        decision = limiter.hit((key_func(request.scope), name), cost)
+        if not decision.allowed:
+            raise ResourceLimitError(name, decision.limit, decision.retry_after)
+        return decision
+
+    return dependency
@@ -0,0 +1,13 @@
+class ResourceLimitError(Exception):
+    """
+    Raised when access to a resource exceeds the allowed limit.
+
+    Attributes:
+        resource (str): The limited resource.
+        limit (int): Configured maximum.
+        retry_after (float): Seconds until the request would be allowed.
+    """
+    def __init__(self, resource: str, limit: int, retry_after: float = 60):
+        self.resource = resource
+        self.limit = limit
+        self.retry_after = retry_after
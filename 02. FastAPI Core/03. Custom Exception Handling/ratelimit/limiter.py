@@ -0,0 +1,85 @@
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+from .algorithms import Algorithm, Decision
+
+
+class Shard:
+    """
+    One lock and the states of the keys that hash to it, least recently used first.
+    """
+    __slots__ = ("lock", "states")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.states: OrderedDict[Hashable, array] = OrderedDict()
+
+
+class RateLimiter:
+    """
+    In-process rate limiter: one algorithm, with per-key state split across
+    independently locked shards.
+
+    Each key's state is an `array('d')` of a few floats, so a key costs roughly one dict
+    entry plus one small array. Threads (e.g. sync endpoints in the threadpool) contend
+    only when their keys share a shard.
+
+    Idle keys are evicted lazily: every hit looks at the least recently used keys of its
+    shard and drops up to `evict_batch` of them whose state has fully recovered, i.e.
+    would decide exactly like a fresh one. Eviction never changes a decision.
+
+    Attributes:
+        algorithm (Algorithm): The policy applied to every key.
+        shards (int): Number of shards (a power of two).
+        evict_batch (int): Maximum idle keys examined per hit.
+        evicted (int): Keys dropped so far.
+    """
+
+    def __init__(self, algorithm: Algorithm, shards: int = 64, evict_batch: int = 2):
+        if shards & (shards - 1):
+            raise ValueError("shards must be a power of two")
+        self.algorithm = algorithm
+        self._shards = [Shard() for _ in range(shards)]
+        self._mask = shards - 1
+        self.shards = shards
+        self.evict_batch = evict_batch
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return sum(len(shard.states) for shard in self._shards)
+
+    @property
+    def limit(self) -> int:
+        return self.algorithm.limit
+
+    def hit(self, key: Hashable, cost: int = 1, now: Optional[float] = None) -> Decision:
+        """
+        Apply one request of `cost` for `key` and return the decision.
+        """
+        if now is None:
+            now = time.monotonic()
+        algorithm = self.algorithm
+        shard = self._shards[hash(key) & self._mask]
+        with shard.lock:
+            states = shard.states
+            state = states.get(key)
+            if state is None:
+                state = states[key] = array("d", algorithm.initial(now))
+            else:
+                states.move_to_end(key)
+            decision = algorithm.decide(state, now, cost)
+            self._evict_idle(states, algorithm, now)
+        return decision
+
+    def _evict_idle(self, states: OrderedDict, algorithm: Algorithm, now: float) -> None:
+        for _ in range(self.evict_batch):
+            key, state = next(iter(states.items()))
+            if algorithm.expires_at(state) > now:
+                return
+            del states[key]
+            self.evicted += 1
+            if not states:
+                return
@@ -0,0 +1,80 @@
+import json
+import math
+from typing import Callable, Hashable
+
+from .algorithms import Decision
+from .limiter import RateLimiter
+
+KeyFunc = Callable[[dict], Hashable]
+
+
+def client_key(scope: dict) -> Hashable:
+    """
+    Default key: the client's IP address.
+    """
+    client = scope.get("client")
+    return client[0] if client else "anonymous"
+
+
+def rate_limit_headers(decision: Decision) -> list[tuple[bytes, bytes]]:
+    """
+    `X-RateLimit-*` headers for a decision, plus `Retry-After` (whole seconds, rounded up)
+    when it was denied.
+    """
+    headers = [
+        (b"x-ratelimit-limit", str(decision.limit).encode()),
+        (b"x-ratelimit-remaining", str(decision.remaining).encode()),
+        (b"x-ratelimit-reset", str(math.ceil(decision.reset_after)).encode()),
+    ]
+    if not decision.allowed and math.isfinite(decision.retry_after):
+        headers.append((b"retry-after", str(math.ceil(decision.retry_after)).encode()))
+    return headers
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware applying one limiter to every HTTP request.
+
+    Denied requests get a 429 straight from the middleware, without entering the app;
+    allowed ones get the `X-RateLimit-*` headers added to their response.
+
+    Args:
+        app: The wrapped ASGI app.
+        limiter (RateLimiter): Limiter to consult (any object with `hit(key)` works).
+        key_func (KeyFunc): Maps the ASGI scope to the rate-limit key; client IP by default.
+    """
+
+    def __init__(self, app, limiter: RateLimiter, key_func: KeyFunc = client_key):
+        self.app = app
+        self.limiter = limiter
+        self.key_func = key_func
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        decision = self.limiter.hit(self.key_func(scope))
+        headers = rate_limit_headers(decision)
+
+        if not decision.allowed:
+            body = json.dumps({
+                "error": "LimitExceeded",
+                "limit": decision.limit,
+                "message": f"Rate limit exceeded. Max allowed: {decision.limit}",
+            }).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [(b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode()), *headers],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
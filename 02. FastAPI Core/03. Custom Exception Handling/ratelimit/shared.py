@@ -0,0 +1,163 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Hashable, Optional
+
+from .algorithms import Algorithm, Decision
+
+MAGIC = b"RLSHM001"
+# magic, slots, words per slot, stripes
+HEADER = struct.Struct("8sQQQ")
+HEADER_SIZE = 64
+WORD = 8
+
+
+def key_hash(key: Hashable) -> int:
+    """
+    Process-independent 64-bit hash of a key (never 0, which marks an empty slot).
+
+    `hash()` is salted per process, so it cannot be used to find a key in a table
+    shared by several workers.
+    """
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+class SharedRateLimiter:
+    """
+    Rate limiter whose state lives in a memory-mapped file, so every worker process on
+    the host enforces one global limit instead of each admitting the full quota.
+
+    The file holds a fixed-size open-addressing hash table. Each slot is a 64-bit key
+    hash followed by the algorithm's state floats. The table is split into `stripes`
+    independent regions; a key hashes to one region and linear-probes only inside it,
+    so a region is guarded by one lock: a byte-range `fcntl` lock on the file (which
+    the OS releases if a worker dies) plus a thread lock, since fcntl locks do not
+    exclude threads of the same process.
+
+    Slots are never emptied. A slot whose state has fully recovered (`expires_at` has
+    passed) is reused by the next new key that probes past it, which is exactly as if
+    the old key had been evicted. If `max_probe` slots are all live, the one closest to
+    expiry is overwritten.
+
+    Only the key's 64-bit hash is stored; two keys colliding on it would share a quota.
+
+    Attributes:
+        algorithm (Algorithm): The policy applied to every key.
+        path (str): Backing file (in /dev/shm when available, so it stays in RAM).
+        slots (int): Total slots in the table.
+        stripes (int): Number of independently locked regions.
+        overwrites (int): Live slots this process had to overwrite because a region was full.
+    """
+
+    def __init__(self, algorithm: Algorithm, name: str = "ratelimit", slots: int = 1 << 20,
+                 stripes: int = 256, max_probe: int = 32, directory: Optional[str] = None):
+        # Unix only; imported here so the package (and the in-memory limiter) still
+        # imports on Windows
+        import fcntl
+
+        if slots % stripes:
+            raise ValueError("slots must be a multiple of stripes")
+        if directory is None:
+            directory = "/dev/shm" if os.path.isdir("/dev/shm") else "/tmp"
+
+        self.algorithm = algorithm
+        self.path = os.path.join(directory, f"{name}.ratelimit")
+        self.slots = slots
+        self.stripes = stripes
+        self.region = slots // stripes
+        self.max_probe = min(max_probe, self.region)
+        self.width = 1 + algorithm.size
+        self.overwrites = 0
+        self._thread_locks = [threading.Lock() for _ in range(stripes)]
+        self._fcntl = fcntl
+
+        size = HEADER_SIZE + slots * self.width * WORD
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        # Byte 0 of the lock space serialises creation; stripe i locks byte i + 1
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, 0)
+        try:
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, HEADER.pack(MAGIC, slots, self.width, stripes), 0)
+            elif os.pread(self._fd, HEADER.size, 0) != HEADER.pack(MAGIC, slots, self.width, stripes):
+                raise ValueError(f"{self.path} was created with a different layout")
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, 0)
+
+        self._map = mmap.mmap(self._fd, size)
+        self._table = memoryview(self._map)[HEADER_SIZE:]
+        self._keys = self._table.cast("Q")
+        self._values = self._table.cast("d")
+
+    @property
+    def limit(self) -> int:
+        return self.algorithm.limit
+
+    def hit(self, key: Hashable, cost: int = 1, now: Optional[float] = None) -> Decision:
+        """
+        Apply one request of `cost` for `key` and return the decision.
+        """
+        if now is None:
+            now = time.monotonic()  # CLOCK_MONOTONIC is system-wide, so workers agree
+        h = key_hash(key)
+        stripe = h % self.stripes
+        fcntl = self._fcntl
+        with self._thread_locks[stripe]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, stripe + 1)
+            try:
+                return self._hit_locked(h, stripe, cost, now)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, stripe + 1)
+
+    def _hit_locked(self, h: int, stripe: int, cost: int, now: float) -> Decision:
+        algorithm, keys, values, width = self.algorithm, self._keys, self._values, self.width
+        base = stripe * self.region
+        home = (h // self.stripes) % self.region
+
+        slot = reusable = None
+        soonest, soonest_at = None, float("inf")
+        for i in range(self.max_probe):
+            index = base + (home + i) % self.region
+            offset = index * width
+            stored = keys[offset]
+            if stored == h:
+                slot = offset
+                break
+            if stored == 0:
+                if reusable is None:
+                    reusable = offset
+                break
+            if reusable is None:
+                expires_at = algorithm.expires_at(values[offset + 1:offset + width])
+                if expires_at <= now:
+                    reusable = offset
+                elif expires_at < soonest_at:
+                    soonest, soonest_at = offset, expires_at
+
+        if slot is None:
+            if reusable is None:
+                reusable = soonest
+                self.overwrites += 1
+            slot = reusable
+            keys[slot] = h
+            for i, value in enumerate(algorithm.initial(now), start=slot + 1):
+                values[i] = value
+
+        return algorithm.decide(values[slot + 1:slot + width], now, cost)
+
+    def close(self) -> None:
+        self._keys.release()
+        self._values.release()
+        self._table.release()
+        self._map.close()
+        os.close(self._fd)
+
+    def unlink(self) -> None:
+        """
+        Remove the backing file; workers that still have it mapped keep their copy.
+        """
+        os.unlink(self.path)
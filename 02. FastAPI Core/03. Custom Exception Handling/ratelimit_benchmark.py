@@ -0,0 +1,76 @@
+import argparse
+import gc
+import os
+import random
+import resource
+import sys
+import time
+
+from colorama import Fore, init
+
+from ratelimit import FixedWindow, LeakyBucket, RateLimiter, SlidingWindow, TokenBucket
+
+init(autoreset=True)
+
+ALGORITHMS = {
+    "fixed": lambda: FixedWindow(limit=100, window=60),
+    "sliding": lambda: SlidingWindow(limit=100, window=60),
+    "token": lambda: TokenBucket(rate=100 / 60, capacity=100),
+    "leaky": lambda: LeakyBucket(rate=100 / 60, capacity=100),
+}
+
+
+def rss_mb() -> float:
+    """
+    Current RSS from /proc on Linux; elsewhere the peak RSS from getrusage.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def bench(name: str, keys: int, decisions: int) -> dict:
+    """
+    Fill a limiter with `keys` distinct keys, then time `decisions` hits on random keys.
+    """
+    sample = [random.randrange(keys) for _ in range(decisions)]
+    gc.collect()
+    limiter = RateLimiter(ALGORITHMS[name]())
+    rss_before = rss_mb()
+    now = time.monotonic()
+
+    start = time.perf_counter()
+    for key in range(keys):
+        limiter.hit(key, now=now)
+    fill = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in sample:
+        limiter.hit(key, now=now)
+    hot = time.perf_counter() - start
+    rss_after = rss_mb()
+
+    return {
+        "keys": len(limiter),
+        "insert_ns": fill / keys * 1e9,
+        "decide_ns": hot / decisions * 1e9,
+        "bytes_per_key": (rss_after - rss_before) * 2**20 / keys,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-decision cost of the rate limiters at many keys.")
+    parser.add_argument("--keys", type=int, nargs="+", default=[10_000, 1_000_000, 3_000_000])
+    parser.add_argument("--decisions", type=int, default=1_000_000)
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS))
+    args = parser.parse_args()
+
+    print(Fore.BLUE + f"{'algorithm':<10} {'keys':>10} {'insert ns':>10} {'decide ns':>10} {'B/key':>8}")
+    for name in args.algorithms:
+        for keys in args.keys:
+            result = bench(name, keys, args.decisions)
+            print(f"{name:<10} {result['keys']:>10} {result['insert_ns']:>10.0f}"
+                  f" {result['decide_ns']:>10.0f} {result['bytes_per_key']:>8.0f}")
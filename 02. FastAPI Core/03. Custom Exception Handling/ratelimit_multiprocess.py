@@ -0,0 +1,69 @@
+import argparse
+import multiprocessing
+import os
+import time
+
+from colorama import Fore, init
+
+from ratelimit import FixedWindow, SharedRateLimiter
+
+init(autoreset=True)
+
+# A fresh table per run
+NAME = f"ratelimit-multiprocess-check-{os.getpid()}"
+
+
+def worker(args: argparse.Namespace, name: str, start_at: float, results: multiprocessing.Queue) -> None:
+    """
+    Hammer the shared keys and report how many requests were admitted per key.
+    """
+    limiter = SharedRateLimiter(FixedWindow(limit=args.limit, window=3600), name=name,
+                                slots=args.slots, stripes=args.stripes)
+    while time.time() < start_at:
+        time.sleep(0.001)
+
+    allowed = [0] * args.keys
+    start = time.perf_counter()
+    for i in range(args.hits):
+        key = i % args.keys
+        if limiter.hit(f"client-{key}").allowed:
+            allowed[key] += 1
+    results.put((allowed, args.hits / (time.perf_counter() - start)))
+    limiter.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check that N processes sharing one SharedRateLimiter admit exactly the limit.")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--keys", type=int, default=100, help="Distinct keys hit by every process")
+    parser.add_argument("--limit", type=int, default=500, help="Requests allowed per key")
+    parser.add_argument("--hits", type=int, default=100_000, help="Requests per process")
+    parser.add_argument("--slots", type=int, default=1 << 16)
+    parser.add_argument("--stripes", type=int, default=256)
+    args = parser.parse_args()
+
+    results: multiprocessing.Queue = multiprocessing.Queue()
+    start_at = time.time() + 1
+    processes = [multiprocessing.Process(target=worker, args=(args, NAME, start_at, results))
+                 for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    SharedRateLimiter(FixedWindow(limit=args.limit, window=3600), name=NAME,
+                      slots=args.slots, stripes=args.stripes).unlink()
+
+    admitted = [sum(allowed[key] for allowed, _ in outcomes) for key in range(args.keys)]
+    expected = min(args.limit, args.processes * args.hits // args.keys)
+    wrong = [key for key, count in enumerate(admitted) if count != expected]
+    throughput = sum(rate for _, rate in outcomes)
+
+    print(Fore.BLUE + f"{args.processes} processes x {args.hits} hits over {args.keys} keys, limit {args.limit}")
+    print(f"admitted per key: min {min(admitted)}, max {max(admitted)}, expected {expected}")
+    print(f"aggregate throughput: {throughput:,.0f} decisions/s ({1e9 / throughput * args.processes:,.0f} ns each)")
+    if wrong:
+        print(Fore.RED + f"FAIL: {len(wrong)} keys admitted the wrong number of requests")
+        raise SystemExit(1)
+    print(Fore.GREEN + "OK: the limit held across processes")
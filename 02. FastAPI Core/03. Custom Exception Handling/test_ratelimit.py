@@ -0,0 +1,74 @@
+import math
+
+import pytest
+
+from ratelimit import FixedWindow, LeakyBucket, RateLimiter, SlidingWindow, TokenBucket, rate_limit
+
+
+def run(algorithm, window: float, start: float, windows: int, per_window: int) -> list[int]:
+    """
+    Offer `per_window` requests spread evenly over each of `windows` windows (starting
+    with the window containing `start`) and return how many were admitted in each.
+    """
+    start = start // window * window
+    state = algorithm.initial(start)
+    admitted = []
+    for n in range(windows):
+        allowed = 0
+        for i in range(per_window):
+            now = start + (n + (i + 0.5) / per_window) * window
+            allowed += algorithm.decide(state, now).allowed
+        admitted.append(allowed)
+    return admitted
+
+
+# 0.1 and 0.3 are not binary fractions, so float window starts computed from different
+# timestamps do not line up exactly
+@pytest.mark.parametrize("window", [0.1, 0.3, 1.0, 60.0])
+@pytest.mark.parametrize("start", [0.0, 1234.5678, 1_700_000_000.123])
+def test_sliding_window_carries_previous_count(window, start):
+    algorithm = SlidingWindow(limit=10, window=window)
+    first = int(start // window)
+    for index in range(first, first + 50):
+        # A full burst late in one window, then another just after the rollover: the
+        # rolling window holds the first burst almost entirely, so the second is denied
+        state = algorithm.initial(index * window)
+        late = (index + 0.95) * window
+        assert sum(algorithm.decide(state, late).allowed for _ in range(10)) == 10
+        early = (index + 1.05) * window
+        assert sum(algorithm.decide(state, early).allowed for _ in range(10)) <= 1
+
+
+@pytest.mark.parametrize("window", [0.1, 0.3, 1.0, 60.0])
+@pytest.mark.parametrize("start", [0.0, 1234.5678, 1_700_000_000.123])
+def test_fixed_window_admits_limit_per_window(window, start):
+    algorithm = FixedWindow(limit=10, window=window)
+    admitted = run(algorithm, window, start, windows=20, per_window=100)
+    assert admitted == [10] * 20
+
+
+def test_sliding_window_state_survives_rollover():
+    algorithm = SlidingWindow(limit=10, window=0.1)
+    state = algorithm.initial(0.35)
+    for _ in range(10):
+        assert algorithm.decide(state, 0.35).allowed
+    # Just after the rollover nearly all of the previous window still overlaps
+    assert not algorithm.decide(state, 0.401).allowed
+    assert state[2] == 10
+    assert algorithm.expires_at(state) == pytest.approx(0.6)
+
+
+@pytest.mark.parametrize("algorithm", [FixedWindow(limit=5, window=1), SlidingWindow(limit=5, window=1),
+                                       TokenBucket(rate=5, capacity=5), LeakyBucket(rate=5, capacity=5)])
+def test_cost_above_limit_is_never_allowed(algorithm):
+    state = algorithm.initial(0.0)
+    decision = algorithm.decide(state, 0.5, cost=10)
+    assert not decision.allowed
+    assert decision.retry_after == math.inf
+    # The key's quota is untouched
+    assert algorithm.decide(state, 0.5).allowed
+
+
+def test_rate_limit_rejects_cost_above_limit():
+    with pytest.raises(ValueError):
+        rate_limit(RateLimiter(SlidingWindow(limit=5, window=1)), cost=10)
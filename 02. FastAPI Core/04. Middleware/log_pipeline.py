@@ -0,0 +1,269 @@
+import atexit
+import copy
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import BinaryIO, Optional, TextIO
+
+import orjson
+
+# Attributes every LogRecord has; anything else on a record came in through `extra=`
+RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+_STOP = object()
+_formatter = logging.Formatter()
+
+
+class QueueingHandler(logging.Handler):
+    """
+    Logging handler that only puts the record on a bounded queue.
+
+    This is the handler the event loop calls, so it never serialises or touches a file;
+    a `LogWriter` thread does that. The message is rendered before the record is queued,
+    like `logging.handlers.QueueHandler.prepare`: mutable `args` are captured with the
+    values they had when logged, and the traceback is formatted so no frames are kept
+    alive in the queue. When the queue is full the record is counted in `dropped` and
+    discarded instead of blocking the caller.
+
+    Attributes:
+        queue (queue.Queue): Records waiting for the writer thread.
+        dropped (int): Records discarded because the queue was full.
+        writer (LogWriter): The thread draining the queue, once `setup` has started it.
+    """
+
+    def __init__(self, maxsize: int = 10_000, level: int = logging.NOTSET):
+        super().__init__(level)
+        self.queue: queue.Queue = queue.Queue(maxsize)
+        self.dropped = 0
+        self.writer: Optional["LogWriter"] = None
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # The base class holds the handler lock around every emit; here it is only
+        # needed for the dropped counter
+        if not self.filter(record):
+            return False
+        self.emit(record)
+        return True
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        A copy of the record with the message rendered and `args` / `exc_info` cleared.
+        """
+        record = copy.copy(record)
+        if isinstance(record.msg, dict):
+            # Structured message (as `LogMiddleware` logs); snapshot it
+            record.msg = dict(record.msg)
+        else:
+            record.msg = record.getMessage()
+        if record.exc_info:
+            record.exc_text = _formatter.formatException(record.exc_info)
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+
+
+class RotatingSink:
+    """
+    Append-only log file that rotates by size: `app.log` -> `app.log.1` -> ... up to
+    `backup_count` files. Only ever used from the writer thread.
+
+    Args:
+        path (str): File to write.
+        max_bytes (int): Rotate before a write would take the file past this size (0 = never).
+        backup_count (int): Rotated files to keep.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 10 * 2**20, backup_count: int = 5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.file: BinaryIO = open(path, "ab")
+        self.size = self.file.tell()
+
+    def write(self, chunk: bytes) -> None:
+        if self.max_bytes and self.size and self.size + len(chunk) > self.max_bytes:
+            self.rotate()
+        self.file.write(chunk)
+        self.size += len(chunk)
+
+    def rotate(self) -> None:
+        self.file.close()
+        if self.backup_count:
+            for i in range(self.backup_count - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{i}"):
+                    os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        self.file = open(self.path, "wb")
+        self.size = 0
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class TextSink:
+    """
+    Adapter for a text stream without a binary `buffer` (e.g. a replaced `sys.stdout`).
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def write(self, chunk: bytes) -> None:
+        self.stream.write(chunk.decode("utf-8", "replace"))
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+class LogWriter(threading.Thread):
+    """
+    Background thread that drains a `QueueingHandler`, serialises records as JSON lines
+    with orjson and writes them in batches.
+
+    A batch is written when it reaches `batch_bytes` or when `flush_interval` seconds
+    have passed since its first record, whichever comes first, so a quiet server still
+    gets its lines out promptly and a busy one makes one write per batch instead of one
+    per record. Whenever the handler has dropped records since the last batch, a
+    warning line with the count is written first.
+
+    Args:
+        handler (QueueingHandler): The handler whose queue to drain.
+        sinks (list): Binary streams (or `RotatingSink`s) every batch is written to.
+        batch_bytes (int): Size that triggers a write.
+        flush_interval (float): Maximum seconds a line waits in the buffer.
+    """
+
+    def __init__(self, handler: QueueingHandler, sinks: list, batch_bytes: int = 64 * 1024,
+                 flush_interval: float = 0.5):
+        super().__init__(name="log-writer", daemon=True)
+        self.handler = handler
+        self.sinks = sinks
+        self.batch_bytes = batch_bytes
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._reported_drops = 0
+
+    def serialize(self, record: logging.LogRecord) -> bytes:
+        """
+        One record as a JSON line. A dict message (as `LogMiddleware` logs) becomes
+        top-level fields, as does anything passed via `extra=`.
+        """
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        if isinstance(record.msg, dict):
+            entry.update(record.msg)
+        else:
+            entry["message"] = record.getMessage()
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return orjson.dumps(entry, default=str, option=OPTIONS)
+
+    def run(self) -> None:
+        get = self.handler.queue.get
+        buffer: list[bytes] = []
+        size = 0
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                record = get(timeout=timeout)
+            except queue.Empty:
+                record = None
+
+            if record is _STOP:
+                self._write(buffer)
+                return
+            if record is not None:
+                try:
+                    line = self.serialize(record)
+                except Exception:
+                    line = orjson.dumps({"level": "ERROR", "message": "unserialisable log record",
+                                         "record": repr(record)}, option=OPTIONS)
+                buffer.append(line)
+                size += len(line)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if size >= self.batch_bytes or (deadline is not None and time.monotonic() >= deadline):
+                self._write(buffer)
+                buffer, size, deadline = [], 0, None
+
+    def _write(self, buffer: list[bytes]) -> None:
+        dropped = self.handler.dropped
+        if dropped != self._reported_drops:
+            warning = {"time": datetime.now(timezone.utc), "level": "WARNING", "logger": "log-writer",
+                       "message": "log queue full, records dropped",
+                       "dropped": dropped - self._reported_drops, "dropped_total": dropped}
+            buffer.insert(0, orjson.dumps(warning, option=OPTIONS))
+            self._reported_drops = dropped
+        if not buffer:
+            return
+
+        chunk = b"".join(buffer)
+        for sink in self.sinks:
+            try:
+                sink.write(chunk)
+                sink.flush()
+            except (OSError, ValueError):
+                # A broken sink must not kill the writer; the others still get the batch
+                pass
+        self.written += len(buffer)
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """
+        Write everything still queued, then stop. Registered with atexit by `setup`.
+        """
+        try:
+            self.handler.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self.join(timeout)
+        for sink in self.sinks:
+            if isinstance(sink, RotatingSink):
+                sink.close()
+
+
+def setup(logger: logging.Logger, path: Optional[str] = "app.log", stdout: bool = True,
+          queue_size: int = 10_000, batch_bytes: int = 64 * 1024, flush_interval: float = 0.5,
+          max_bytes: int = 10 * 2**20, backup_count: int = 5) -> QueueingHandler:
+    """
+    Route `logger` through a `QueueingHandler` and start its `LogWriter`.
+
+    Returns:
+        QueueingHandler: The installed handler (its `dropped` count is the one to watch).
+    """
+    sinks: list = []
+    if stdout and sys.stdout is not None:
+        buffer = getattr(sys.stdout, "buffer", None)
+        sinks.append(buffer if buffer is not None else TextSink(sys.stdout))
+    if path:
+        sinks.append(RotatingSink(path, max_bytes, backup_count))
+
+    handler = QueueingHandler(queue_size)
+    writer = LogWriter(handler, sinks, batch_bytes, flush_interval)
+    handler.writer = writer
+    logger.handlers = [handler]
+    logger.propagate = False
+    writer.start()
+    atexit.register(writer.stop)
+    return handler
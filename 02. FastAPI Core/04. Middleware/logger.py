@@ -1,25 +1,23 @@
 import logging
-import sys
+import os
 
+import log_pipeline
 
-logger = logging.getLogger("FastApp")
-
-#creating formatter
-formatter = logging.Formatter(fmt="time: %(asctime)s - log_level: %(levelname)s - message: %(message)s")
 
-#create handlers
-stream_handler = logging.StreamHandler(sys.stdout)
-file_handler = logging.FileHandler('app.log')
-
-#set formatters
-stream_handler.setFormatter(formatter)
-file_handler.setFormatter(formatter)
+logger = logging.getLogger("FastApp")
 
-#adding handlers to the logger instance
-logger.handlers = [stream_handler, file_handler]
+# Records are only enqueued on the calling thread; a background thread writes them as
+# JSON lines to stdout and a size-rotated file (see log_pipeline.py)
+log_handler = log_pipeline.setup(
+    logger,
+    path=os.getenv("LOG_FILE", "app.log") or None,
+    stdout=os.getenv("LOG_STDOUT", "1") == "1",
+    queue_size=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+    batch_bytes=int(os.getenv("LOG_BATCH_BYTES", str(64 * 1024))),
+    flush_interval=float(os.getenv("LOG_FLUSH_INTERVAL", "0.5")),
+    max_bytes=int(os.getenv("LOG_MAX_BYTES", str(10 * 2**20))),
+    backup_count=int(os.getenv("LOG_BACKUP_COUNT", "5")),
+)
 
 #setting log level 
 logger.setLevel(logging.INFO)
-
-
-
@@ -0,0 +1,98 @@
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from colorama import Fore, init
+
+import log_pipeline
+from metrics import percentile
+
+init(autoreset=True)
+
+
+class SlowStream:
+    """
+    Binary or text stream wrapper that sleeps on every flush, standing in for a slow
+    disk or a stdout pipe nobody is reading fast enough.
+    """
+
+    def __init__(self, stream, delay: float):
+        self.stream = stream
+        self.delay = delay
+
+    def write(self, data):
+        return self.stream.write(data)
+
+    def flush(self):
+        self.stream.flush()
+        if self.delay:
+            time.sleep(self.delay)
+
+
+def synchronous_logger(directory: str, delay: float) -> logging.Logger:
+    """
+    The previous setup: formatted text through a StreamHandler and a FileHandler,
+    both written on the calling thread.
+    """
+    logger = logging.getLogger("bench-sync")
+    formatter = logging.Formatter(fmt="time: %(asctime)s - log_level: %(levelname)s - message: %(message)s")
+    stream_handler = logging.StreamHandler(SlowStream(open(os.devnull, "w"), delay))
+    file_handler = logging.FileHandler(os.path.join(directory, "sync.log"))
+    file_handler.stream = SlowStream(file_handler.stream, delay)
+    for handler in (stream_handler, file_handler):
+        handler.setFormatter(formatter)
+    logger.handlers = [stream_handler, file_handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def queued_logger(directory: str, delay: float, queue_size: int) -> tuple[logging.Logger, log_pipeline.QueueingHandler]:
+    logger = logging.getLogger("bench-queued")
+    handler = log_pipeline.setup(logger, path=os.path.join(directory, "queued.log"), stdout=False,
+                                 queue_size=queue_size)
+    handler.writer.sinks.append(SlowStream(open(os.devnull, "wb"), delay))
+    logger.setLevel(logging.INFO)
+    return logger, handler
+
+
+def bench(logger: logging.Logger, records: int) -> dict:
+    """
+    Time each `logger.info` call as the event loop would see it.
+    """
+    latencies = []
+    for i in range(records):
+        log_dict = {'url': '/', 'method': 'GET', 'status_code': 200, 'process_time': 0.0001 * i}
+        start = time.perf_counter()
+        logger.info(log_dict, extra=log_dict)
+        latencies.append(time.perf_counter() - start)
+    return {
+        "total": sum(latencies),
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Caller-side cost of synchronous vs queued logging.")
+    parser.add_argument("--records", type=int, default=50_000)
+    parser.add_argument("--slow-ms", type=float, default=0.0, help="Delay added to every sink flush")
+    parser.add_argument("--queue-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        delay = args.slow_ms / 1000
+        sync = bench(synchronous_logger(directory, delay), args.records)
+        logger, handler = queued_logger(directory, delay, args.queue_size)
+        queued = bench(logger, args.records)
+        handler.writer.stop()
+
+        print(Fore.BLUE + f"{args.records} records, sink delay {args.slow_ms} ms per flush")
+        print(Fore.BLUE + f"{'pipeline':<12} {'total ms':>10} {'p50 us':>8} {'p99 us':>8} {'max us':>9}")
+        for name, result in (("synchronous", sync), ("queued", queued)):
+            print(f"{name:<12} {result['total'] * 1000:>10.1f} {result['p50'] * 1e6:>8.1f}"
+                  f" {result['p99'] * 1e6:>8.1f} {result['max'] * 1e6:>9.1f}")
+        print(f"queued: {handler.writer.written} lines written, {handler.dropped} dropped")
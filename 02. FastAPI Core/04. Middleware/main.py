@@ -1,47 +1,34 @@
-from fastapi import FastAPI, Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from middleware import log_middleware
-import time
+import asyncio
+import os
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+from metrics import registry
+from middleware import LogMiddleware, MetricsMiddleware, ProcessTimeMiddleware
+from server_timing import ServerTimingMiddleware, instrument_fastapi, phase, timed
+
+# Record the deps / handler / serialize phases of every route
+instrument_fastapi()
 
 # Create FastAPI application instance
 app = FastAPI()
 
 # ================================
-# Simple Inline Middleware
+# Pure ASGI Middleware
 # ================================
 
-@app.middleware("http")
-async def simple_middleware(request: Request, call_next):
-    """
-    Middleware that logs entry/exit and adds request processing time to the response headers.
-    
-    Args:
-        request (Request): The incoming HTTP request object.
-        call_next (Callable): The next middleware or route handler in the chain.
-
-    Returns:
-        Response: The final response with an additional X-Process-Time header.
-    """
-    print("Entering First Middleware")
-
-    start_time = time.time()
-
-    # Forward the request to the next middleware/route handler
-    response: Response = await call_next(request)
+# Adds the X-Process-Time header (innermost, so it times only the app)
+app.add_middleware(ProcessTimeMiddleware)
 
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
+# Sends the per-phase breakdown as a Server-Timing header
+app.add_middleware(ServerTimingMiddleware)
 
-    print("Exiting First Middleware")
+# Logs method, path, status and processing time of a sample of requests
+app.add_middleware(LogMiddleware, sample_rate=float(os.getenv("LOG_SAMPLE_RATE", "0.01")))
 
-    return response
-
-# ================================
-# External Middleware via dispatch function
-# ================================
-
-# Adds custom middleware (imported from middleware.py) using Starlette's BaseHTTPMiddleware
-app.add_middleware(BaseHTTPMiddleware, dispatch=log_middleware)
+# Records latency, status and in-flight counts of every request (outermost)
+app.add_middleware(MetricsMiddleware)
 
 # ================================
 # Route Handlers
@@ -56,3 +43,44 @@ async def home():
         dict: A simple response indicating the server is running.
     """
     return {"ping": "pong"}
+
+
+class Settings(BaseModel):
+    """
+    Application settings data.
+    """
+    app_name: str = 'Chai App'
+    admin_email: str = 'admin@chai.com'
+
+
+@timed()
+def get_settings() -> Settings:
+    """
+    Dependency that returns app settings, reported as its own `dep.get_settings` phase.
+    """
+    return Settings()
+
+
+@app.get("/settings")
+async def read_settings(settings: Settings = Depends(get_settings)):
+    """
+    Endpoint showing every phase in its Server-Timing header.
+
+    Returns:
+        Settings: The current settings.
+    """
+    with phase("db"):
+        # Stands in for a database round trip
+        await asyncio.sleep(0.002)
+    return settings
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Request metrics in the Prometheus text format.
+
+    Returns:
+        PlainTextResponse: Latency histograms, status counts and in-flight requests.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
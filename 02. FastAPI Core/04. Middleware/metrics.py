@@ -0,0 +1,215 @@
+from array import array
+from typing import Optional
+
+# Route label for requests that matched no route, so unknown paths cannot grow the
+# number of series without bound
+UNMATCHED = "<unmatched>"
+
+
+class LatencyHistogram:
+    """
+    Fixed-memory, log-linear latency histogram in the style of HdrHistogram.
+
+    Values are whole microseconds. Below `2**precision` every value has its own bucket;
+    above it each power-of-two range is split into `2**(precision - 1)` equal buckets,
+    so any recorded value is off by at most `2**-(precision - 1)` of itself (about 3%
+    at the default precision of 6) from its bucket's bounds. All counts live in one
+    preallocated `array('Q')`, so recording a value is a little integer arithmetic and
+    an in-place increment: no per-request objects are created.
+
+    Args:
+        precision (int): Significant bits kept per value.
+        max_us (int): Largest distinguishable value; anything above lands in the last bucket.
+
+    Attributes:
+        counts (array): Count per bucket.
+        count (int): Values recorded.
+        total_us (int): Sum of recorded values.
+    """
+
+    def __init__(self, precision: int = 6, max_us: int = 60_000_000):
+        self.precision = precision
+        self.sub_buckets = 1 << precision
+        self.half = self.sub_buckets >> 1
+        self.max_us = max_us
+        self.counts = array("Q", bytes(8 * (self.index(max_us) + 1)))
+        self.count = 0
+        self.total_us = 0
+
+    def index(self, value: int) -> int:
+        """
+        Bucket holding `value` (in microseconds).
+        """
+        if value < self.sub_buckets:
+            return value
+        shift = value.bit_length() - self.precision
+        return shift * self.half + (value >> shift)
+
+    def upper_bound(self, index: int) -> int:
+        """
+        Exclusive upper bound, in microseconds, of bucket `index`.
+        """
+        if index < self.sub_buckets:
+            return index + 1
+        shift = index // self.half - 1
+        return ((index - shift * self.half) + 1) << shift
+
+    def record(self, value_us: int) -> None:
+        if value_us > self.max_us:
+            value_us = self.max_us
+        self.counts[self.index(value_us)] += 1
+        self.count += 1
+        self.total_us += value_us
+
+    def quantile(self, q: float) -> float:
+        """
+        Upper bound, in seconds, of the bucket holding the `q` quantile (0 if empty).
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, round(q * self.count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.upper_bound(index) / 1e6
+        return self.max_us / 1e6
+
+    def cumulative(self) -> list[tuple[int, int]]:
+        """
+        (upper bound in microseconds, cumulative count) at each power of two from
+        `2**precision` up to the highest occupied bucket; these are exact bucket edges,
+        so the coarse buckets Prometheus gets are exact too.
+        """
+        edges = []
+        seen = 0
+        edge = self.sub_buckets
+        for index, count in enumerate(self.counts):
+            if self.upper_bound(index) > edge:
+                edges.append((edge, seen))
+                if seen == self.count:
+                    break
+                edge <<= 1
+            seen += count
+        return edges
+
+
+class RouteMetrics:
+    """
+    Latency histogram and status-code counts for one (method, route template) pair.
+
+    Attributes:
+        histogram (LatencyHistogram): Request latency.
+        statuses (array): Responses per status code, indexed by the code itself.
+    """
+
+    def __init__(self, precision: int, max_us: int):
+        self.histogram = LatencyHistogram(precision, max_us)
+        self.statuses = array("Q", bytes(8 * 600))
+
+
+class MetricsRegistry:
+    """
+    Per-route request metrics, filled by `MetricsMiddleware` and rendered for `/metrics`.
+
+    Series are keyed by method and route template (`/items/{item_id}`, never the raw
+    path), so their number is bounded by the app's routes. A route's series is created
+    the first time it is hit; after that, recording only looks it up and increments
+    preallocated counters. Everything runs on the event loop thread, so no locking.
+
+    Attributes:
+        in_flight (int): Requests currently being handled.
+    """
+
+    def __init__(self, precision: int = 6, max_us: int = 60_000_000):
+        self.precision = precision
+        self.max_us = max_us
+        self.in_flight = 0
+        self._series: dict[str, dict[str, RouteMetrics]] = {}
+
+    def series(self, method: str, route: str) -> RouteMetrics:
+        by_route = self._series.get(method)
+        if by_route is None:
+            by_route = self._series[method] = {}
+        metrics = by_route.get(route)
+        if metrics is None:
+            metrics = by_route[route] = RouteMetrics(self.precision, self.max_us)
+        return metrics
+
+    def record(self, method: str, route: str, status_code: int, duration_ns: int) -> None:
+        metrics = self.series(method, route)
+        metrics.histogram.record(duration_ns // 1000)
+        if 100 <= status_code < 600:
+            metrics.statuses[status_code] += 1
+
+    def render(self, quantiles: tuple = (0.5, 0.9, 0.99, 0.999)) -> str:
+        """
+        All series in the Prometheus text exposition format (version 0.0.4).
+        """
+        lines = [
+            "# HELP http_requests_in_flight Requests currently being handled.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP http_requests_total Responses by route, method and status code.",
+            "# TYPE http_requests_total counter",
+        ]
+        series = [(method, route, metrics) for method, by_route in sorted(self._series.items())
+                  for route, metrics in sorted(by_route.items())]
+
+        for method, route, metrics in series:
+            labels = f'method="{method}",route="{escape(route)}"'
+            for code, count in enumerate(metrics.statuses):
+                if count:
+                    lines.append(f'http_requests_total{{{labels},status="{code}"}} {count}')
+
+        lines += [
+            "# HELP http_request_duration_seconds Request latency by route and method.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for method, route, metrics in series:
+            labels = f'method="{method}",route="{escape(route)}"'
+            histogram = metrics.histogram
+            for edge, cumulative in histogram.cumulative():
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{edge / 1e6:g}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {histogram.total_us / 1e6}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {histogram.count}")
+
+        lines += [
+            "# HELP http_request_latency_seconds Request latency quantiles from the full-resolution histogram.",
+            "# TYPE http_request_latency_seconds summary",
+        ]
+        for method, route, metrics in series:
+            labels = f'method="{method}",route="{escape(route)}"'
+            histogram = metrics.histogram
+            for q in quantiles:
+                lines.append(f'http_request_latency_seconds{{{labels},quantile="{q}"}} {histogram.quantile(q)}')
+            lines.append(f"http_request_latency_seconds_sum{{{labels}}} {histogram.total_us / 1e6}")
+            lines.append(f"http_request_latency_seconds_count{{{labels}}} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """
+    Nearest-rank `pct` percentile of `values` (nan when there are none).
+    """
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def route_template(scope: dict) -> Optional[str]:
+    """
+    Path template of the route the router matched (FastAPI stores it in the scope).
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None)
+
+
+registry = MetricsRegistry()
@@ -1,37 +1,127 @@
-from fastapi import Request
 from logger import logger
+from metrics import UNMATCHED, registry, route_template
+import random
 import time
 
-async def log_middleware(request: Request, call_next):
+
+class ProcessTimeMiddleware:
+    """
+    Pure ASGI middleware that stamps `X-Process-Time` on every HTTP response.
+
+    Wrapping `send` adds the header to the `http.response.start` message as it goes
+    past, so the response body is never buffered or re-wrapped and streaming responses
+    pass straight through.
+
+    Args:
+        app: The wrapped ASGI app.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        async def send_with_time(message):
+            if message["type"] == "http.response.start":
+                process_time = time.perf_counter() - start
+                message["headers"] = [*message.get("headers", []), (b"x-process-time", str(process_time).encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_time)
+
+
+class LogMiddleware:
     """
-    Custom logging middleware that logs HTTP request metadata and processing time.
-    
+    Pure ASGI middleware that logs HTTP request metadata and processing time.
+
+    The status code is picked up from `http.response.start` on its way out; the record
+    is written once the app has sent the whole response. Latency and status counts for
+    every request are in `/metrics`, so only a `sample_rate` fraction of requests is
+    logged, plus every 5xx.
+
     Args:
-        request (Request): The incoming HTTP request.
-        call_next (Callable): The next middleware or route handler in the chain.
-    
-    Returns:
-        Response: The HTTP response after processing.
+        app: The wrapped ASGI app.
+        sample_rate (float): Fraction of non-error requests to log.
     """
-    print("Entering Second Middleware")
 
-    start = time.time()
+    def __init__(self, app, sample_rate: float = 1.0):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            if status_code >= 500 or random.random() < self.sample_rate:
+                # Construct log entry
+                log_dict = {
+                    'url': scope["path"],
+                    'method': scope["method"],
+                    'status_code': status_code,
+                    'process_time': time.perf_counter() - start
+                }
+                if "server_timing" in scope:
+                    # Per-phase milliseconds from ServerTimingMiddleware
+                    log_dict['timings'] = scope["server_timing"].milliseconds()
+
+                # Log with structured data
+                logger.info(log_dict, extra=log_dict)
 
-    # Pass the request to the next middleware/route handler
-    response = await call_next(request)
 
-    process_time = time.time() - start
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware that feeds every HTTP request into the metrics registry:
+    latency per route template and method, status codes and requests in flight.
+
+    The route template is read from the scope after the app has run, since the router
+    only stores the matched route there while dispatching.
+
+    Args:
+        app: The wrapped ASGI app.
+        registry (MetricsRegistry): Where to record; defaults to the shared one `/metrics` serves.
+    """
+
+    def __init__(self, app, registry=registry):
+        self.app = app
+        self.registry = registry
 
-    # Construct log entry
-    log_dict = {
-        'url': request.url.path,
-        'method': request.method,
-        'process_time': process_time
-    }
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    # Log with structured data
-    logger.info(log_dict, extra=log_dict)
+        registry = self.registry
+        registry.in_flight += 1
+        start = time.perf_counter_ns()
+        status_code = 500
 
-    print("Exiting Second Middleware")
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
-    return response
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            registry.in_flight -= 1
+            registry.record(scope["method"], route_template(scope) or UNMATCHED, status_code,
+                            time.perf_counter_ns() - start)
@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+from colorama import Fore, init
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from logger import logger
+from metrics import percentile
+from middleware import LogMiddleware, ProcessTimeMiddleware
+
+init(autoreset=True)
+
+# Both stacks below do the same work per request: time it, add X-Process-Time and log
+# every request. main.py's app is not used, because it also carries the metrics and
+# Server-Timing layers and importing it patches fastapi.routing for every app.
+
+
+async def home():
+    return {"ping": "pong"}
+
+
+def build_legacy_app() -> FastAPI:
+    """
+    The previous stack: an `@app.middleware("http")` function under a
+    `BaseHTTPMiddleware(dispatch=...)`, minus the prints.
+    """
+    legacy = FastAPI()
+
+    @legacy.middleware("http")
+    async def simple_middleware(request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        response.headers["X-Process-Time"] = str(time.time() - start_time)
+        return response
+
+    async def log_middleware(request: Request, call_next):
+        start = time.time()
+        response = await call_next(request)
+        log_dict = {'url': request.url.path, 'method': request.method, 'process_time': time.time() - start}
+        logger.info(log_dict, extra=log_dict)
+        return response
+
+    legacy.add_middleware(BaseHTTPMiddleware, dispatch=log_middleware)
+    legacy.get("/")(home)
+    return legacy
+
+
+def build_asgi_app() -> FastAPI:
+    """
+    The same two middlewares as pure ASGI classes, logging every request.
+    """
+    app = FastAPI()
+    app.add_middleware(ProcessTimeMiddleware)
+    app.add_middleware(LogMiddleware, sample_rate=1.0)
+    app.get("/")(home)
+    return app
+
+
+async def bench(app, requests: int, concurrency: int) -> dict:
+    """
+    Drive an app in-process through httpx's ASGI transport, so only the app and its
+    middleware are measured, not the network.
+    """
+    latencies: list[float] = []
+    gate = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one():
+            async with gate:
+                start = time.perf_counter()
+                await client.get("/")
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    return {"rps": requests / elapsed, "p50": percentile(latencies, 50), "p99": percentile(latencies, 99)}
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Measure middleware overhead, not log I/O
+    logger.setLevel(logging.CRITICAL)
+
+    print(Fore.BLUE + f"{'stack':<22} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, app in (("BaseHTTPMiddleware", build_legacy_app()), ("pure ASGI", build_asgi_app())):
+        await bench(app, args.requests // 10, args.concurrency)  # warm-up
+        result = await bench(app, args.requests, args.concurrency)
+        print(f"{name:<22} {result['rps']:>10.0f} {result['p50'] * 1000:>8.2f} {result['p99'] * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the old and new middleware stacks.")
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    asyncio.run(main(parser.parse_args()))
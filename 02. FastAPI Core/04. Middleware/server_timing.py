@@ -0,0 +1,177 @@
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+import fastapi.routing
+
+
+class Timings:
+    """
+    Phase durations of one request, in nanoseconds.
+
+    Durations of the same name add up, so a phase entered several times (e.g. `db`
+    around each query) reports its total. Phases can nest: `db` time spent inside the
+    handler is counted in both.
+
+    Attributes:
+        start (int): `perf_counter_ns()` when the request arrived.
+        phases (dict): Phase name -> accumulated nanoseconds, in first-recorded order.
+        handler_end (int): When the endpoint function returned (0 if it has not).
+    """
+    __slots__ = ("start", "phases", "handler_end")
+
+    def __init__(self):
+        self.start = time.perf_counter_ns()
+        self.phases: dict[str, int] = {}
+        self.handler_end = 0
+
+    def add(self, name: str, duration_ns: int) -> None:
+        self.phases[name] = self.phases.get(name, 0) + duration_ns
+
+    def milliseconds(self) -> dict[str, float]:
+        return {name: round(duration / 1e6, 3) for name, duration in self.phases.items()}
+
+    def header(self) -> bytes:
+        """
+        The phases as a `Server-Timing` header value (durations in milliseconds).
+        """
+        return ", ".join(f"{name};dur={duration / 1e6:.3f}" for name, duration in self.phases.items()).encode()
+
+
+# The current request's Timings. The object itself is mutated rather than the variable
+# re-set, so code running in a copied context (sync dependencies in the threadpool)
+# still records into the request it belongs to.
+current: ContextVar[Optional[Timings]] = ContextVar("server_timing", default=None)
+
+
+def record(name: str, duration_ns: int) -> None:
+    """
+    Add `duration_ns` to phase `name` of the current request (no-op outside one).
+    """
+    timings = current.get()
+    if timings is not None:
+        timings.add(name, duration_ns)
+
+
+@contextmanager
+def phase(name: str):
+    """
+    Time the enclosed block as phase `name`, e.g. `with phase("db"): ...`.
+    """
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter_ns() - start)
+
+
+def timed(name: Optional[str] = None):
+    """
+    Decorator recording each call of a sync or async function as its own phase
+    (`dep.<function name>` by default). `functools.wraps` keeps the signature visible,
+    so FastAPI still resolves the parameters of a decorated dependency.
+    """
+    def decorator(func):
+        label = name or f"dep.{func.__name__}"
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter_ns()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    record(label, time.perf_counter_ns() - start)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(label, time.perf_counter_ns() - start)
+        return wrapper
+
+    return decorator
+
+
+def instrument_fastapi() -> None:
+    """
+    Time FastAPI's own request phases for every route.
+
+    FastAPI's request handler resolves the dependency tree with `solve_dependencies`
+    and calls the endpoint through `run_endpoint_function`, both looked up as globals
+    of `fastapi.routing` (checked against the pinned 0.115). Wrapping those two globals
+    yields the `deps` and `handler` phases. `serialize` is the gap from the handler
+    returning to the response starting, which covers response-model validation,
+    `jsonable_encoder` and rendering. Safe to call more than once.
+    """
+    if getattr(fastapi.routing, "_server_timing_instrumented", False):
+        return
+    solve_dependencies = fastapi.routing.solve_dependencies
+    run_endpoint_function = fastapi.routing.run_endpoint_function
+
+    async def timed_solve_dependencies(*args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return await solve_dependencies(*args, **kwargs)
+        finally:
+            record("deps", time.perf_counter_ns() - start)
+
+    async def timed_run_endpoint_function(*args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return await run_endpoint_function(*args, **kwargs)
+        finally:
+            end = time.perf_counter_ns()
+            timings = current.get()
+            if timings is not None:
+                timings.add("handler", end - start)
+                timings.handler_end = end
+
+    fastapi.routing.solve_dependencies = timed_solve_dependencies
+    fastapi.routing.run_endpoint_function = timed_run_endpoint_function
+    fastapi.routing._server_timing_instrumented = True
+
+
+class ServerTimingMiddleware:
+    """
+    Pure ASGI middleware that collects the phases of each HTTP request and sends them
+    as a `Server-Timing` header, which browser devtools show in the network panel.
+
+    A fresh `Timings` is put in the `current` context variable for the request, and in
+    `scope["server_timing"]` so outer middleware (such as `LogMiddleware`) can read it
+    after the response. `serialize` and `total` are filled in as the response starts.
+
+    Args:
+        app: The wrapped ASGI app.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = scope["server_timing"] = Timings()
+        token = current.set(timings)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                now = time.perf_counter_ns()
+                if timings.handler_end:
+                    timings.add("serialize", now - timings.handler_end)
+                timings.add("total", now - timings.start)
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timings.header())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current.reset(token)
@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import time
+
+import httpx
+from colorama import Fore, init
+
+init(autoreset=True)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(args: argparse.Namespace) -> None:
+    """
+    Fire `--requests` callbacks, at most `--concurrency` at a time, and report latency.
+    """
+    latencies: list[float] = []
+    errors = 0
+    gate = asyncio.Semaphore(args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=30,
+                                 limits=httpx.Limits(max_connections=args.concurrency)) as client:
+        async def callback(i: int):
+            nonlocal errors
+            async with gate:
+                start = time.perf_counter()
+                try:
+                    res = await client.get("/auth/callback", params={"code": f"user{i}"})
+                    res.raise_for_status()
+                    latencies.append(time.perf_counter() - start)
+                except httpx.HTTPError:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(callback(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - start
+
+    print(Fore.BLUE + f"{args.requests} callbacks, concurrency {args.concurrency}, {elapsed:.2f}s")
+    print(f"throughput {len(latencies) / elapsed:.1f}/s, errors {errors}")
+    print(
+        f"p50 {percentile(latencies, 50) * 1000:.1f}ms"
+        f"  p95 {percentile(latencies, 95) * 1000:.1f}ms"
+        f"  p99 {percentile(latencies, 99) * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test /auth/callback against fake_idp.py.")
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of main.py")
+    parser.add_argument("--requests", type=int, default=2000, help="Total callbacks")
+    parser.add_argument("--concurrency", type=int, default=200, help="Callbacks in flight")
+    asyncio.run(run(parser.parse_args()))
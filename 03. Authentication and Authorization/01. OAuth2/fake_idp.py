@@ -0,0 +1,115 @@
+from fastapi import FastAPI, Form, Header, HTTPException
+from fastapi.responses import JSONResponse, RedirectResponse
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+import jwt
+
+try:
+    from cryptography.hazmat.primitives.asymmetric import rsa
+except ImportError:
+    rsa = None  # No RS256 signing: tokens are issued without an id_token
+
+
+app = FastAPI()
+
+# Simulated provider latency per call, to see how the callback behaves when Google is slow
+LATENCY = float(os.getenv("FAKE_IDP_LATENCY_MS", "20")) / 1000
+ISSUER = os.getenv("FAKE_IDP_ISSUER", "https://accounts.google.com")
+JWKS_MAX_AGE = int(os.getenv("FAKE_IDP_JWKS_MAX_AGE", "3600"))
+
+
+def new_signing_key() -> tuple[str, object]:
+    """
+    A fresh (kid, RSA private key) pair.
+    """
+    return uuid.uuid4().hex[:16], rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+# Newest key first; it signs new id_tokens, the others stay published for verification
+signing_keys = [new_signing_key()] if rsa else []
+
+
+def profile(subject: str) -> dict:
+    """
+    Deterministic fake profile for a subject, shaped like Google's userinfo response.
+    """
+    user_id = str(int(hashlib.sha256(subject.encode()).hexdigest()[:15], 16))
+    return {
+        "id": user_id,
+        "email": f"{subject}@example.com",
+        "verified_email": True,
+        "name": subject.title(),
+        "picture": f"https://example.com/{user_id}.png",
+    }
+
+
+@app.get("/auth")
+async def authorize(redirect_uri: str, state: str = "", login_hint: str = "user"):
+    """
+    Skips the consent screen and redirects straight back with a code for `login_hint`.
+    """
+    return RedirectResponse(f"{redirect_uri}?code={login_hint}&state={state}")
+
+
+@app.post("/token")
+async def token(code: str = Form(...), grant_type: str = Form(...), client_id: str = Form("")):
+    """
+    Exchanges any code for an access token and, when RS256 signing is available, an
+    id_token. The code doubles as the user's subject, so every callback in a load test
+    can log in a different user without shared state.
+    """
+    await asyncio.sleep(LATENCY)
+    if grant_type != "authorization_code":
+        raise HTTPException(status_code=400, detail="unsupported_grant_type")
+
+    response = {"access_token": f"fake.{code}", "token_type": "Bearer", "expires_in": 3599,
+                "scope": "openid profile email"}
+    if signing_keys:
+        kid, key = signing_keys[0]
+        user = profile(code)
+        now = int(time.time())
+        claims = {
+            "iss": ISSUER, "aud": client_id, "sub": user["id"], "email": user["email"],
+            "email_verified": user["verified_email"], "name": user["name"],
+            "picture": user["picture"], "iat": now, "exp": now + 3600,
+        }
+        response["id_token"] = jwt.encode(claims, key, algorithm="RS256", headers={"kid": kid})
+    return response
+
+
+@app.get("/jwks")
+async def jwks():
+    """
+    Public signing keys, cacheable for FAKE_IDP_JWKS_MAX_AGE seconds like Google's certs.
+    """
+    keys = []
+    for kid, key in signing_keys:
+        jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(key.public_key()))
+        keys.append({**jwk, "kid": kid, "alg": "RS256", "use": "sig"})
+    return JSONResponse({"keys": keys}, headers={"Cache-Control": f"public, max-age={JWKS_MAX_AGE}"})
+
+
+@app.post("/rotate")
+async def rotate():
+    """
+    Start signing with a new key. Clients holding a cached key set will meet an unknown
+    kid on their next login, which exercises the rotation-miss refresh.
+    """
+    if not signing_keys:
+        raise HTTPException(status_code=501, detail="RS256 signing needs the cryptography package")
+    signing_keys.insert(0, new_signing_key())
+    del signing_keys[2:]
+    return {"kid": signing_keys[0][0]}
+
+
+@app.get("/userinfo")
+async def userinfo(authorization: str = Header("")):
+    await asyncio.sleep(LATENCY)
+    scheme, _, access_token = authorization.partition(" ")
+    if scheme != "Bearer" or not access_token.startswith("fake."):
+        raise HTTPException(status_code=401, detail="invalid_token")
+    return profile(access_token[len("fake."):])
@@ -0,0 +1,169 @@
+import asyncio
+import email.utils
+import re
+import time
+from typing import Optional, Sequence
+
+import httpx
+import jwt
+
+# RS256 keys need PyJWT's optional `cryptography` backend
+HAS_CRYPTO = jwt.algorithms.has_crypto
+
+
+class KeyNotFound(Exception):
+    """
+    Raised when an id_token is signed with a key ID the provider does not publish.
+    """
+
+
+class JWKSUnavailable(Exception):
+    """
+    Raised when the JWKS endpoint fails or does not return a JSON key set.
+    """
+
+
+def cache_ttl(response: httpx.Response, default: float) -> float:
+    """
+    Seconds a JWKS response may be cached, from `Cache-Control` (`no-store` and
+    `no-cache` mean 0, else `max-age`) or `Expires`. `JWKSCache` raises this to its
+    `min_ttl`, so even a `no-store` key set is kept that long.
+    """
+    cache_control = response.headers.get("cache-control", "").lower()
+    if re.search(r"\bno-(store|cache)\b", cache_control):
+        return 0.0
+    match = re.search(r"max-age=(\d+)", cache_control)
+    if match:
+        return float(match.group(1))
+
+    expires = response.headers.get("expires")
+    if expires:
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(expires).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+    return default
+
+
+class JWKSCache:
+    """
+    In-memory copy of a provider's signing keys, for verifying id_tokens locally.
+
+    Keys are refreshed in the background shortly before the provider's cache lifetime
+    runs out, so logins normally never wait on the JWKS endpoint. If a token names a key
+    we do not have (the provider rotated keys since our last fetch), one immediate
+    refresh is attempted, rate-limited so forged key IDs cannot hammer the provider.
+
+    Attributes:
+        url (str): JWKS endpoint.
+        default_ttl (float): Cache lifetime when the response has no cache headers.
+        min_ttl (float): Lower bound on the lifetime, whatever the headers say (including
+            `no-store` and `max-age=0`), so the endpoint is fetched at most that often.
+        refresh_cooldown (float): Minimum seconds between two on-demand refreshes.
+        expires_at (float): When the current key set goes stale.
+    """
+
+    def __init__(self, http: httpx.AsyncClient, url: str, default_ttl: float = 3600,
+                 min_ttl: float = 60, refresh_cooldown: float = 30):
+        self.http = http
+        self.url = url
+        self.default_ttl = default_ttl
+        self.min_ttl = min_ttl
+        self.refresh_cooldown = refresh_cooldown
+        self.expires_at = 0.0
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._last_refresh = 0.0
+        self._refreshing: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> None:
+        """
+        Fetch the key set. Concurrent callers share one request.
+        """
+        if self._refreshing is None:
+            self._refreshing = asyncio.create_task(self._fetch())
+        task = self._refreshing
+        try:
+            await asyncio.shield(task)
+        finally:
+            if self._refreshing is task and task.done():
+                self._refreshing = None
+
+    async def _fetch(self) -> None:
+        self._last_refresh = time.monotonic()
+        try:
+            response = await self.http.get(self.url, timeout=5.0)
+            response.raise_for_status()
+            body = response.json()
+        except httpx.HTTPError as e:
+            raise JWKSUnavailable(f"JWKS request failed: {e}") from e
+        except ValueError as e:
+            raise JWKSUnavailable("JWKS response is not JSON") from e
+        if not isinstance(body, dict) or not isinstance(body.get("keys", []), list):
+            raise JWKSUnavailable("JWKS response has no key list")
+
+        keys = {}
+        for jwk in body.get("keys", []):
+            if not isinstance(jwk, dict) or "kid" not in jwk:
+                continue
+            try:
+                keys[jwk["kid"]] = jwt.PyJWK(jwk)
+            except (jwt.PyJWKError, jwt.InvalidKeyError):
+                continue  # Key type we cannot use
+        self._keys = keys
+        self.expires_at = time.time() + max(self.min_ttl, cache_ttl(response, self.default_ttl))
+
+    async def get_key(self, kid: str) -> jwt.PyJWK:
+        """
+        Return the key with this ID, refreshing once on a miss.
+
+        Raises:
+            KeyNotFound: If the key is still unknown after a refresh (or one was too recent).
+            JWKSUnavailable: If the refresh failed.
+        """
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+
+        if time.monotonic() - self._last_refresh >= self.refresh_cooldown or self._refreshing:
+            await self.refresh()
+            key = self._keys.get(kid)
+            if key is not None:
+                return key
+        raise KeyNotFound(kid)
+
+    async def verify(self, id_token: str, audience: str, issuer: Sequence[str]) -> dict:
+        """
+        Verify an id_token's signature, audience, issuer and expiry; return its claims.
+
+        Raises:
+            KeyNotFound: If the signing key is unknown.
+            JWKSUnavailable: If the keys could not be fetched.
+            jwt.PyJWTError: If the token is malformed or fails verification.
+        """
+        kid = jwt.get_unverified_header(id_token).get("kid", "")
+        key = await self.get_key(kid)
+        return jwt.decode(
+            id_token,
+            key=key.key,
+            algorithms=[key.algorithm_name or "RS256"],
+            audience=audience,
+            issuer=list(issuer),
+            leeway=30,
+        )
+
+    async def run(self) -> None:
+        """
+        Keep the key set fresh; meant to run as one background task.
+
+        Refreshes at 90% of the cache lifetime and retries with backoff on errors, while
+        the previous keys stay in use.
+        """
+        backoff = 1.0
+        while True:
+            try:
+                await self.refresh()
+                backoff = 1.0
+                await asyncio.sleep(max(1.0, (self.expires_at - time.time()) * 0.9))
+            except JWKSUnavailable:
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
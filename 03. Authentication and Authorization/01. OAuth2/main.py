@@ -1,11 +1,59 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
-import requests
+from contextlib import asynccontextmanager
+from jwks import HAS_CRYPTO, JWKSCache, JWKSUnavailable, KeyNotFound
+import asyncio
+import httpx
+import jwt
 import os
 
 
-app = FastAPI()
+# Provider endpoints; point them at fake_idp.py to run without network access
+GOOGLE_AUTH_URL = os.getenv("GOOGLE_AUTH_URL", "https://accounts.google.com/o/oauth2/auth")
+GOOGLE_TOKEN_URL = os.getenv("GOOGLE_TOKEN_URL", "https://oauth2.googleapis.com/token")
+GOOGLE_USERINFO_URL = os.getenv("GOOGLE_USERINFO_URL", "https://www.googleapis.com/oauth2/v1/userinfo")
+GOOGLE_JWKS_URL = os.getenv("GOOGLE_JWKS_URL", "https://www.googleapis.com/oauth2/v3/certs")
+GOOGLE_ISSUERS = os.getenv("GOOGLE_ISSUERS", "https://accounts.google.com,accounts.google.com").split(",")
+
+# Per-call timeouts (seconds) for the calls made during the callback
+TOKEN_TIMEOUT = httpx.Timeout(5.0, connect=2.0)
+USERINFO_TIMEOUT = httpx.Timeout(3.0, connect=2.0)
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Shared client for calls to the identity provider.
+
+    Connections are pooled and kept alive across logins, so a callback skips the TCP and
+    TLS handshakes. HTTP/2 is used when the optional `h2` package is installed.
+    """
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=TOKEN_TIMEOUT,
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=50, keepalive_expiry=60),
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.http = create_http_client()
+    # Provider signing keys, kept fresh in the background for local id_token checks
+    app.state.jwks = JWKSCache(app.state.http, GOOGLE_JWKS_URL)
+    refresher = asyncio.create_task(app.state.jwks.run()) if HAS_CRYPTO else None
+    yield
+    if refresher is not None:
+        refresher.cancel()
+    await app.state.http.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS settings
 app.add_middleware(
@@ -42,7 +90,7 @@ async def login_google():
         dict: Dictionary with the generated login URL.
     """
     url = (
-        "https://accounts.google.com/o/oauth2/auth"
+        f"{GOOGLE_AUTH_URL}"
         f"?response_type=code"
         f"&client_id={CLIENT_ID}"
         f"&redirect_uri={REDIRECT_URI}"
@@ -53,18 +101,53 @@ async def login_google():
     return {"url": url}
 
 
+async def verify_id_token(jwks: JWKSCache, id_token: str | None) -> dict | None:
+    """
+    Verify an id_token against the cached provider keys and map its claims to the
+    userinfo shape.
+
+    Args:
+        jwks (JWKSCache): Provider signing keys.
+        id_token (str | None): The `id_token` from the token response, if any.
+
+    Returns:
+        dict | None: User profile, or None when the caller should fall back to userinfo.
+
+    Raises:
+        HTTPException: If the id_token is present but fails verification.
+    """
+    if not id_token or not HAS_CRYPTO:
+        return None
+
+    try:
+        claims = await jwks.verify(id_token, audience=CLIENT_ID, issuer=GOOGLE_ISSUERS)
+    except (KeyNotFound, JWKSUnavailable):
+        return None
+    except jwt.PyJWTError as e:
+        raise HTTPException(status_code=401, detail=f"Invalid id_token: {e}")
+
+    return {
+        "id": claims["sub"],
+        "email": claims.get("email"),
+        "verified_email": claims.get("email_verified", False),
+        "name": claims.get("name"),
+        "picture": claims.get("picture"),
+    }
+
+
 @app.get("/auth/callback")
-async def auth_google(code: str):
+async def auth_google(request: Request, code: str):
     """
     Callback endpoint triggered after Google authenticates the user.
 
     Args:
+        request (Request): Incoming request, used to reach the shared HTTP client.
         code (str): Authorization code received from Google.
 
     Returns:
         dict: User profile info or error details.
     """
-    token_url = "https://oauth2.googleapis.com/token"
+    http: httpx.AsyncClient = request.app.state.http
     token_data = {
         "code": code,
         "client_id": CLIENT_ID,
@@ -75,7 +158,7 @@ async def auth_google(code: str):
 
     try:
         # Exchange authorization code for access token
-        token_response = requests.post(token_url, data=token_data)
+        token_response = await http.post(GOOGLE_TOKEN_URL, data=token_data, timeout=TOKEN_TIMEOUT)
         token_response.raise_for_status()
         token_json = token_response.json()
 
@@ -84,15 +167,19 @@ async def auth_google(code: str):
 
         access_token = token_json["access_token"]
 
-        # Fetch user info
-        user_info_response = requests.get(
-            "https://www.googleapis.com/oauth2/v1/userinfo",
-            headers={"Authorization": f"Bearer {access_token}"}
-        )
-        user_info_response.raise_for_status()
-        user = user_info_response.json()
+        # The id_token already says who the user is; verifying it locally saves a round trip
+        user = await verify_id_token(request.app.state.jwks, token_json.get("id_token"))
+        if user is None:
+            # No usable id_token (or its key is unknown even after a refresh): ask the provider
+            user_info_response = await http.get(
+                GOOGLE_USERINFO_URL,
+                headers={"Authorization": f"Bearer {access_token}"},
+                timeout=USERINFO_TIMEOUT,
+            )
+            user_info_response.raise_for_status()
+            user = user_info_response.json()
 
         return {"user": user}
 
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,18 +1,74 @@
 from fastapi import FastAPI, status, HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel, Field
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-import bcrypt
+import asyncio
+import os
 import uuid
 import jwt
+from sqlalchemy.exc import IntegrityError
+from token_cache import TokenCache
+from password_pool import PoolSaturated, create_password_pool
+from user_store import create_user_repository
+from revocation import RevocationList
 
-app = FastAPI()
+# bcrypt runs in worker processes so logins never block the event loop
+password_pool = create_password_pool()
+
+# Credentials live in SQL (unique index on email) behind a small read-through cache
+users = create_user_repository()
+
+DEMO_EMAIL = "user@gmail.com"
+
+
+async def seed_demo_user():
+    """
+    Create the demo account on first start. The hash is computed in the password pool,
+    and only when the row is missing, so imports and warm restarts pay no bcrypt cost.
+    """
+    if await asyncio.to_thread(users.get_by_email, DEMO_EMAIL) is None:
+        hashed = await password_pool.hashpw("password")
+        try:
+            await asyncio.to_thread(users.add, DEMO_EMAIL, hashed, str(uuid.uuid4()))
+        except IntegrityError:
+            pass  # Another worker seeded it first
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    password_pool.start()
+    await asyncio.to_thread(users.create_schema)
+    await seed_demo_user()
+    refresher = asyncio.create_task(refresh_revocations())
+    yield
+    refresher.cancel()
+    password_pool.shutdown()
+    users.engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 SECRET_KEY = "ae24d2f464bb9e2e91d8c5e57483406546755cc62c4102436d26daf62cbef244"
 ALGORITHM = "HS256"
 
 oauth = OAuth2PasswordBearer(tokenUrl="/login")
 
+# Verified payloads of recently seen tokens, so repeat callers skip the HMAC and JSON decode
+token_cache = TokenCache(maxsize=10_000, ttl=300)
+
+# Revoked token IDs: Bloom filter in front of an exact jti -> exp map, shared via an append-only log
+revocations = RevocationList(path=os.getenv("REVOCATION_LOG", "revoked.jsonl"))
+
+
+async def refresh_revocations():
+    """
+    Pick up revocations made by other workers.
+    """
+    while True:
+        await asyncio.to_thread(revocations.refresh)
+        await asyncio.sleep(1)
+
 
 class UserLogin(BaseModel):
     """
@@ -26,16 +82,6 @@ class UserLogin(BaseModel):
     password: str
 
 
-# Simulated user database with email as key
-# Value is a tuple of (hashed_password, user_id)
-demo_db = {
-    "user@gmail.com": (
-        bcrypt.hashpw("password".encode(), bcrypt.gensalt()),
-        str(uuid.uuid4())
-    )
-}
-
-
 def get_token_data(token: str = Depends(oauth)) -> dict:
     """
     Dependency to decode and validate JWT access token.
@@ -46,6 +92,24 @@ def get_token_data(token: str = Depends(oauth)) -> dict:
     Returns:
         dict: Payload of the token.
 
+    Raises:
+        HTTPException: If token is expired, invalid or revoked.
+    """
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = verify_token(token)
+        token_cache.put(token, payload)
+
+    jti = payload.get("jti")
+    if jti is not None and revocations.is_revoked(jti):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    return payload
+
+
+def verify_token(token: str) -> dict:
+    """
+    Check the signature and expiry of a token and return its payload.
+
     Raises:
         HTTPException: If token is expired or invalid.
     """
@@ -72,6 +136,17 @@ async def home():
     return {"ping": "pong"}
 
 
+@app.get("/stats")
+async def stats():
+    """
+    Hot-path counters for capacity planning.
+
+    Returns:
+        dict: Token cache size and hit/miss counts, password pool queue depth and hash time.
+    """
+    return {"token_cache": token_cache.stats(), "password_pool": password_pool.stats()}
+
+
 @app.post("/login")
 async def login(user: UserLogin):
     """
@@ -84,18 +159,24 @@ async def login(user: UserLogin):
         dict: Access token.
 
     Raises:
-        HTTPException: If user is not found or password is invalid.
+        HTTPException: If user is not found or password is invalid, or 503 when the
+            password pool is saturated.
     """
-    hashed = demo_db.get(user.email, None)
+    hashed = await asyncio.to_thread(users.get_by_email, user.email)
     if not hashed:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    is_match = bcrypt.checkpw(user.password.encode(), hashed[0])  # type: ignore
+    try:
+        is_match = await password_pool.checkpw(user.password, hashed[0])
+    except PoolSaturated:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Too many logins in progress", headers={"Retry-After": "1"})
     if not is_match:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid password")
 
     payload = {
         "user_id": hashed[1],
+        "jti": str(uuid.uuid4()),
         "exp": (datetime.utcnow() + timedelta(days=3)).timestamp()
     }
 
@@ -118,3 +199,26 @@ async def get_data(token_data: dict = Depends(get_token_data)):
         "message": "Access granted to protected data.",
         "user_id": token_data["user_id"]
     }
+
+
+@app.post("/revoke")
+async def revoke(token_data: dict = Depends(get_token_data)):
+    """
+    Revoke the presented token (e.g. on logout). It is rejected by every worker from then
+    on until it would have expired anyway.
+
+    Args:
+        token_data (dict): Decoded token payload (injected via dependency).
+
+    Returns:
+        dict: Confirmation with the revoked token ID.
+
+    Raises:
+        HTTPException: If the token predates token IDs and cannot be revoked.
+    """
+    jti = token_data.get("jti")
+    if jti is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Token has no jti")
+
+    await asyncio.to_thread(revocations.revoke, jti, token_data["exp"])
+    return {"status": "revoked", "jti": jti}
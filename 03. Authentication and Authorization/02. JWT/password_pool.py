@@ -0,0 +1,118 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+import bcrypt
+
+
+class PoolSaturated(Exception):
+    """
+    Raised when the password pool already has `max_pending` jobs queued or running.
+    """
+
+
+def _hash(password: bytes) -> tuple[float, bytes]:
+    start = time.perf_counter()
+    hashed = bcrypt.hashpw(password, bcrypt.gensalt())
+    return time.perf_counter() - start, hashed
+
+
+def _check(password: bytes, hashed: bytes) -> tuple[float, bool]:
+    start = time.perf_counter()
+    is_match = bcrypt.checkpw(password, hashed)
+    return time.perf_counter() - start, is_match
+
+
+class PasswordPool:
+    """
+    Runs bcrypt in a process pool with admission control.
+
+    bcrypt is deliberately slow CPU work; on the event loop it stalls every other request,
+    and in threads it still competes for the GIL around the call. Jobs go to separate
+    processes instead, and at most `max_pending` may be queued or running at once: past
+    that, callers get `PoolSaturated` immediately rather than waiting behind the backlog.
+
+    Attributes:
+        workers (int): Number of worker processes.
+        max_pending (int): Admission limit for queued plus running jobs.
+        pending (int): Jobs currently queued or running.
+        completed (int): Jobs finished so far.
+        rejected (int): Jobs refused because the pool was saturated.
+        hash_time (float): Total seconds spent inside bcrypt across all jobs.
+        max_hash_time (float): Slowest single bcrypt call, in seconds.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 16):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.hash_time = 0.0
+        self.max_hash_time = 0.0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn: Callable, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PoolSaturated(f"{self.pending} password jobs pending")
+
+        self.start()
+        self.pending += 1
+        try:
+            elapsed, result = await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+        self.completed += 1
+        self.hash_time += elapsed
+        self.max_hash_time = max(self.max_hash_time, elapsed)
+        return result
+
+    async def hashpw(self, password: str) -> bytes:
+        """
+        Hash a password with a fresh salt.
+        """
+        return await self._run(_hash, password.encode())
+
+    async def checkpw(self, password: str, hashed: bytes) -> bool:
+        """
+        Check a password against a bcrypt hash.
+        """
+        return await self._run(_check, password.encode(), hashed)
+
+    def stats(self) -> dict:
+        """
+        Queue depth and hash-time metrics for sizing login capacity.
+        """
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "running": min(self.pending, self.workers),
+            "queued": max(0, self.pending - self.workers),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_hash_ms": self.hash_time / self.completed * 1000 if self.completed else 0.0,
+            "max_hash_ms": self.max_hash_time * 1000,
+        }
+
+
+def create_password_pool() -> PasswordPool:
+    """
+    Build the pool from PASSWORD_POOL_WORKERS and PASSWORD_POOL_MAX_PENDING.
+    """
+    return PasswordPool(
+        workers=int(os.getenv("PASSWORD_POOL_WORKERS", str(os.cpu_count() or 2))),
+        max_pending=int(os.getenv("PASSWORD_POOL_MAX_PENDING", "32")),
+    )
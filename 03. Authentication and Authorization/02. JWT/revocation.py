@@ -0,0 +1,213 @@
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Sized for `capacity` items at a false-positive rate of `error_rate`. Probe positions
+    come from one BLAKE2b digest split into two 64-bit halves (double hashing), so a
+    lookup costs one small hash plus `k` bit tests.
+
+    Attributes:
+        capacity (int): Items it was sized for.
+        size (int): Number of bits.
+        hashes (int): Number of bit positions per item.
+    """
+    __slots__ = ("capacity", "size", "hashes", "_bits")
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """
+    Exclusive lock shared by all processes on the host: flock on Unix, a locked first
+    byte (`msvcrt.locking`, which retries for about 10 s) on Windows.
+    """
+    with open(path, "a+b") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+            return
+        lock.seek(0)
+        msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class RevocationList:
+    """
+    Revoked token IDs (`jti`), checked in front of every protected request.
+
+    A Bloom filter answers the common "not revoked" case with a few bit probes; only
+    its positives consult the exact `jti -> exp` map. Entries are dropped once their
+    token has expired anyway, and the filter is rebuilt from the survivors, since bits
+    cannot be removed from a Bloom filter.
+
+    All workers share an append-only log of `[jti, exp]` JSON lines. `revoke` appends
+    one line under a file lock and adds the jti to the existing filter, so a revocation
+    costs the same however many are live. `refresh` reads only the bytes appended since
+    its last read. Once more than half the log's lines have expired (and there are at
+    least `compact_after`), the log is rewritten with the live entries through an atomic
+    rename. The new inode tells every other worker to reload it from the start.
+
+    Attributes:
+        path (str): Log file.
+        capacity (int): Expected number of live revocations, used to size the filter.
+        compact_after (int): Minimum log lines before compaction is considered.
+    """
+
+    def __init__(self, path: str = "revoked.jsonl", capacity: int = 100_000, error_rate: float = 0.001,
+                 compact_after: int = 10_000):
+        self.path = path
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.compact_after = compact_after
+        self._revoked: dict[str, float] = {}
+        self._bloom = BloomFilter(capacity, error_rate)
+        # Identity of the log file we have read and how far: (inode, offset)
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._lines = 0
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti: str) -> bool:
+        """
+        True if the token ID has been revoked and its token has not yet expired.
+        """
+        if jti not in self._bloom:
+            return False
+        exp = self._revoked.get(jti)
+        return exp is not None and exp > time.time()
+
+    def revoke(self, jti: str, exp: float) -> None:
+        """
+        Revoke a token ID until `exp` and append it to the log for the other workers.
+        """
+        line = (json.dumps([jti, exp]) + "\n").encode()
+        with self._lock, file_lock(self.path + ".lock"):
+            self._catch_up()
+            with open(self.path, "ab") as log:
+                log.write(line)
+                inode = os.fstat(log.fileno()).st_ino
+            if inode != self._inode:
+                # First write creates the log
+                self._inode, self._offset = inode, 0
+            self._offset += len(line)
+            self._lines += 1
+            self._add(jti, exp)
+            if self._lines >= self.compact_after and self._lines > 2 * len(self._live()):
+                self._compact()
+
+    def refresh(self) -> None:
+        """
+        Pick up lines other workers have appended, or reload a compacted log.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        # Appends always grow the file and compaction replaces it, so identity plus size
+        # catches every change, however close together (unlike the mtime)
+        if stat.st_ino == self._inode and stat.st_size == self._offset:
+            return
+        with self._lock:
+            self._catch_up()
+
+    def _catch_up(self) -> None:
+        """
+        Read what was appended since our offset; start over if the file was replaced.
+        """
+        try:
+            log = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with log:
+            inode = os.fstat(log.fileno()).st_ino
+            if inode != self._inode:
+                self._inode, self._offset, self._lines = inode, 0, 0
+                self._revoked, self._bloom = {}, BloomFilter(self.capacity, self.error_rate)
+            log.seek(self._offset)
+            data = log.read()
+        # A line still being written by another worker is left for the next read
+        end = data.rfind(b"\n") + 1
+        for raw in data[:end].splitlines():
+            try:
+                jti, exp = json.loads(raw)
+            except (ValueError, TypeError):
+                continue
+            self._add(jti, exp)
+            self._lines += 1
+        self._offset += end
+
+    def _add(self, jti: str, exp: float) -> None:
+        """
+        Record one entry, growing the filter if it outgrows its capacity.
+
+        Readers are lock-free: the map and filter are updated in place (single dict and
+        byte stores), and a grown filter is built first and swapped in one assignment.
+        """
+        self._revoked[jti] = exp
+        if len(self._revoked) > self._bloom.capacity:
+            self._install(self._revoked, 2 * len(self._revoked))
+        else:
+            self._bloom.add(jti)
+
+    def _live(self) -> dict[str, float]:
+        now = time.time()
+        return {jti: exp for jti, exp in self._revoked.items() if exp > now}
+
+    def _install(self, revoked: dict[str, float], capacity: int) -> None:
+        bloom = BloomFilter(max(self.capacity, capacity), self.error_rate)
+        for jti in revoked:
+            bloom.add(jti)
+        self._revoked = dict(revoked)
+        self._bloom = bloom
+
+    def _compact(self) -> None:
+        """
+        Rewrite the log with only unexpired entries. Called with the file lock held.
+        """
+        live = self._live()
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as log:
+            log.write(b"".join((json.dumps([jti, exp]) + "\n").encode() for jti, exp in live.items()))
+        os.replace(tmp, self.path)
+        stat = os.stat(self.path)
+        self._install(live, len(live))
+        self._inode, self._offset, self._lines = stat.st_ino, stat.st_size, len(live)
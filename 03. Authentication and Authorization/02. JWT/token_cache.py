@@ -0,0 +1,71 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified JWT payloads.
+
+    Keys are SHA-256 digests of the raw token, so the cache never holds bearer tokens
+    themselves. An entry lives for at most `ttl` seconds and never past the token's
+    `exp` claim, so an expired token is rejected exactly on time even when it is cached.
+
+    Sync dependencies run in FastAPI's threadpool, hence the lock.
+
+    Attributes:
+        maxsize (int): Maximum number of cached tokens; the least recently used is evicted.
+        ttl (float): Upper bound in seconds on how long a payload is trusted without re-verifying.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that required a full decode.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """
+        Return the cached payload for a token, or None if absent or past its expiry.
+        """
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, payload = entry
+                if time.time() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return payload
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, payload: dict) -> None:
+        """
+        Cache a verified payload until `min(now + ttl, exp)`.
+        """
+        expires_at = min(time.time() + self.ttl, payload.get("exp", float("inf")))
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, payload)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters and current size.
+        """
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
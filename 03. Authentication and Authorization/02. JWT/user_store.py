@@ -0,0 +1,113 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import LargeBinary, String, create_engine, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
+
+# (hashed_password, user_id), the shape `login()` needs
+UserRecord = tuple[bytes, str]
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class User(Base):
+    """
+    Stored credentials of one user.
+
+    Fields:
+        - id: Primary key.
+        - email: Login name, unique and indexed so lookups are a B-tree search.
+        - password_hash: bcrypt hash of the password.
+        - user_id: Public ID put in issued tokens.
+    """
+    __tablename__ = "users"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    email: Mapped[str] = mapped_column(String(320), unique=True, index=True)
+    password_hash: Mapped[bytes] = mapped_column(LargeBinary(60))
+    user_id: Mapped[str] = mapped_column(String(36), unique=True)
+
+
+class UserRepository(ABC):
+    """
+    Interface for looking up and storing users by email.
+    """
+
+    @abstractmethod
+    def get_by_email(self, email: str) -> Optional[UserRecord]:
+        ...
+
+    @abstractmethod
+    def add(self, email: str, password_hash: bytes, user_id: str) -> UserRecord:
+        ...
+
+
+class SQLUserRepository(UserRepository):
+    """
+    SQLAlchemy-backed user store with a small read-through cache.
+
+    Rows are looked up through the unique index on `email`. Found users are kept in an
+    LRU of plain (hash, user_id) tuples, so repeat logins skip the session and the query.
+    Unknown emails are not cached, so a newly added user is visible at once.
+
+    Attributes:
+        engine: Pooled SQLAlchemy engine.
+        cache_size (int): Maximum number of cached user rows.
+    """
+
+    def __init__(self, url: str = "sqlite:///users.db", cache_size: int = 1024):
+        self.engine = create_engine(url, pool_size=5, max_overflow=10, pool_pre_ping=True)
+        self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, UserRecord] = OrderedDict()
+        # Lookups run in worker threads
+        self._lock = threading.Lock()
+
+    def create_schema(self) -> None:
+        Base.metadata.create_all(self.engine)
+
+    def _remember(self, email: str, record: UserRecord) -> None:
+        with self._lock:
+            self._cache[email] = record
+            self._cache.move_to_end(email)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def get_by_email(self, email: str) -> Optional[UserRecord]:
+        with self._lock:
+            record = self._cache.get(email)
+            if record is not None:
+                self._cache.move_to_end(email)
+                return record
+
+        with self.Session() as session:
+            row = session.execute(
+                select(User.password_hash, User.user_id).where(User.email == email)
+            ).first()
+        if row is None:
+            return None
+
+        record = (row.password_hash, row.user_id)
+        self._remember(email, record)
+        return record
+
+    def add(self, email: str, password_hash: bytes, user_id: str) -> UserRecord:
+        with self.Session() as session:
+            session.add(User(email=email, password_hash=password_hash, user_id=user_id))
+            session.commit()
+
+        record = (password_hash, user_id)
+        self._remember(email, record)
+        return record
+
+
+def create_user_repository() -> SQLUserRepository:
+    """
+    Build the repository from USER_DB_URL (defaults to a local SQLite file).
+    """
+    return SQLUserRepository(os.getenv("USER_DB_URL", "sqlite:///users.db"))
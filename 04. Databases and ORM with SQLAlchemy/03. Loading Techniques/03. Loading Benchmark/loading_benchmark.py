@@ -0,0 +1,237 @@
+import argparse
+import gc
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+from colorama import Fore, init
+from faker import Faker
+from sqlalchemy import Column, ForeignKey, Integer, String, create_engine, event, insert, select
+from sqlalchemy.orm import (declarative_base, joinedload, raiseload, relationship, selectinload,
+                            sessionmaker, subqueryload)
+from sqlalchemy.orm.attributes import set_committed_value
+
+init(autoreset=True)
+
+Base = declarative_base()
+
+
+class User(Base):
+    """
+    Same shape as the Lazy/Eager Loading examples; the strategy is chosen per query.
+    """
+    __tablename__ = "users"
+
+    id = Column(Integer, primary_key=True)
+    username = Column(String)
+    posts = relationship("Post", lazy="select", backref="user")
+
+
+class Post(Base):
+    """
+    A user's post. `user_id` is indexed, as it would be in any real schema; without it
+    every lazy load is a full scan and the comparison says nothing about loading.
+    """
+    __tablename__ = "posts"
+
+    id = Column(Integer, primary_key=True)
+    content = Column(String)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+
+
+class Counters:
+    """
+    Statements executed, and rows and cells (rows x columns) fetched, through the
+    instrumented connections. Cells show what joined loading costs on the wire: every
+    parent column is repeated on each child row.
+    """
+    queries = 0
+    rows = 0
+    cells = 0
+
+    @classmethod
+    def reset(cls):
+        cls.queries = cls.rows = cls.cells = 0
+
+    @classmethod
+    def add(cls, rows: list):
+        if rows:
+            cls.rows += len(rows)
+            cls.cells += len(rows) * len(rows[0])
+
+
+class CountingCursor(sqlite3.Cursor):
+    """
+    sqlite3 cursor that counts every row handed to SQLAlchemy.
+    """
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            Counters.add([row])
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        Counters.add(rows)
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        Counters.add(rows)
+        return rows
+
+
+class CountingConnection(sqlite3.Connection):
+    def cursor(self, factory=CountingCursor):
+        return super().cursor(factory)
+
+
+def load_select(session):
+    # One query for the users, then one per user as `posts` is touched (N+1)
+    users = session.scalars(select(User)).all()
+    return users, sum(len(user.posts) for user in users)
+
+
+def load_joined(session):
+    # One LEFT OUTER JOIN; every user row is repeated once per post, then de-duplicated
+    users = session.scalars(select(User).options(joinedload(User.posts))).unique().all()
+    return users, sum(len(user.posts) for user in users)
+
+
+def load_selectin(session):
+    # One query for the users, then posts in batches of `WHERE user_id IN (...)`
+    users = session.scalars(select(User).options(selectinload(User.posts))).all()
+    return users, sum(len(user.posts) for user in users)
+
+
+def load_subquery(session):
+    # One query for the users, then one for all posts joined to the original query as a subquery
+    users = session.scalars(select(User).options(subqueryload(User.posts))).all()
+    return users, sum(len(user.posts) for user in users)
+
+
+def load_raise_explicit(session):
+    # raiseload makes any implicit load an error; posts are fetched once and assigned by hand
+    users = session.scalars(select(User).options(raiseload(User.posts))).all()
+    by_user = defaultdict(list)
+    for post in session.scalars(select(Post).order_by(Post.user_id)):
+        by_user[post.user_id].append(post)
+    for user in users:
+        set_committed_value(user, "posts", by_user.get(user.id, []))
+    return users, sum(len(user.posts) for user in users)
+
+
+STRATEGIES = {
+    "select": load_select,
+    "joined": load_joined,
+    "selectin": load_selectin,
+    "subquery": load_subquery,
+    "raise+explicit": load_raise_explicit,
+}
+
+
+def make_engine(path: str):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"factory": CountingConnection})
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        Counters.queries += 1
+
+    return engine
+
+
+def seed(engine, users: int, posts_per_user: int, batch: int = 20_000):
+    """
+    Fill the tables with `users` users and `posts_per_user` posts each, through Core
+    executemany inserts (Faker per row would dominate at a million posts).
+    """
+    fake = Faker()
+    Faker.seed(0)
+    sentences = [fake.sentence() for _ in range(512)]
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for start in range(0, users, batch):
+            ids = range(start + 1, min(start + batch, users) + 1)
+            conn.execute(insert(User), [{"id": i, "username": f"user{i}"} for i in ids])
+            conn.execute(insert(Post), [
+                {"user_id": i, "content": sentences[(i * posts_per_user + n) % len(sentences)]}
+                for i in ids for n in range(posts_per_user)
+            ])
+
+
+def dataset(directory: str, users: int, posts_per_user: int):
+    """
+    Engine on a database for one scale, seeded on first use and reused afterwards.
+    """
+    path = os.path.join(directory, f"loading_{users}x{posts_per_user}.db")
+    fresh = not os.path.exists(path)
+    engine = make_engine(path)
+    if fresh:
+        print(Fore.BLUE + f"seeding {users} users x {posts_per_user} posts into {path}")
+        seed(engine, users, posts_per_user)
+    # First connect runs the dialect's setup queries; keep them out of the first measurement
+    engine.connect().close()
+    return engine
+
+
+def run(engine, strategy: str, trace_memory: bool) -> dict:
+    Session = sessionmaker(bind=engine)
+    gc.collect()
+    Counters.reset()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with Session() as session:
+        users, posts = STRATEGIES[strategy](session)
+        loaded = (len(users), posts)
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {"ms": elapsed * 1000, "queries": Counters.queries, "rows": Counters.rows,
+            "cells": Counters.cells, "peak_mb": peak / 2**20, "loaded": loaded}
+
+
+def parse_scale(value: str) -> tuple[int, int]:
+    users, posts = value.lower().replace("k", "000").split("x")
+    return int(users), int(posts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare relationship loading strategies at several scales.")
+    parser.add_argument("--scales", nargs="+", type=parse_scale, default=["1kx10", "10kx100", "100kx5"],
+                        help="users x posts per user, e.g. 1kx10")
+    parser.add_argument("--strategies", nargs="+", choices=STRATEGIES, default=list(STRATEGIES))
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per cell; the best is kept")
+    parser.add_argument("--db-dir", default=os.path.join(tempfile.gettempdir(), "loading_benchmark"))
+    parser.add_argument("--output", default="loading_benchmark.txt", help="Results table to write")
+    args = parser.parse_args()
+    args.scales = [parse_scale(scale) if isinstance(scale, str) else scale for scale in args.scales]
+    os.makedirs(args.db_dir, exist_ok=True)
+
+    header = f"{'scale':<12} {'strategy':<15} {'wall ms':>10} {'queries':>9} {'rows':>10} {'cells':>10} {'peak MB':>9}"
+    lines = [header, "-" * len(header)]
+    print(Fore.BLUE + header)
+    for users, posts_per_user in args.scales:
+        engine = dataset(args.db_dir, users, posts_per_user)
+        for strategy in args.strategies:
+            # Wall time without tracemalloc, which slows allocation-heavy code several times over
+            timed = min((run(engine, strategy, trace_memory=False) for _ in range(args.repeat)),
+                        key=lambda result: result["ms"])
+            memory = run(engine, strategy, trace_memory=True)
+            assert timed["loaded"] == (users, users * posts_per_user), timed["loaded"]
+
+            line = (f"{f'{users}x{posts_per_user}':<12} {strategy:<15} {timed['ms']:>10.1f}"
+                    f" {timed['queries']:>9} {timed['rows']:>10} {timed['cells']:>10} {memory['peak_mb']:>9.1f}")
+            lines.append(line)
+            print(line)
+        engine.dispose()
+
+    with open(args.output, "w") as output:
+        output.write("\n".join(lines) + "\n")
+    print(Fore.GREEN + f"results written to {args.output}")
@@ -0,0 +1,110 @@
+from sqlalchemy import create_engine, Column, ForeignKey, Integer, String
+from sqlalchemy.orm import sessionmaker, relationship, declarative_base, selectinload
+from faker import Faker
+from colorama import Fore, init
+
+from query_tracer import NPlusOneError, instrument, trace
+
+init(autoreset=True)
+
+DB_URL = "sqlite:///user.db"
+fake = Faker()
+
+# echo is off: the tracer reports the statements instead
+engine = instrument(create_engine(DB_URL))
+Session = sessionmaker(bind=engine)
+session = Session()
+Base = declarative_base()
+
+
+class User(Base):
+    """
+    Represents a user in the system.
+
+    Attributes:
+        id (int): Primary key identifier for the user.
+        username (str): The username of the user.
+        posts (List[Post]): List of posts made by the user, lazily loaded.
+    """
+    __tablename__ = "users"
+
+    id = Column(Integer, primary_key=True)
+    username = Column(String)
+
+    # Lazy loading: posts are loaded from the database only when accessed
+    posts = relationship("Post", lazy="select", backref="user")
+
+
+class Post(Base):
+    """
+    Represents a post created by a user.
+
+    Attributes:
+        id (int): Primary key identifier for the post.
+        content (str): Content of the post.
+        user_id (int): Foreign key to the user who created the post.
+    """
+    __tablename__ = "posts"
+
+    id = Column(Integer, primary_key=True)
+    content = Column(String)
+    user_id = Column(Integer, ForeignKey("users.id"))
+
+
+# Create tables in the database
+Base.metadata.create_all(engine)
+
+
+def add_dummy_data(users: int = 20):
+    """
+    Adds users with two dummy posts each to the database.
+    """
+    for _ in range(users):
+        user = User(username=fake.user_name())
+        user.posts.append(Post(content=fake.sentence()))
+        user.posts.append(Post(content=fake.sentence()))
+        session.add(user)
+    session.commit()
+
+
+def show_user_posts():
+    """
+    Lazy loading: one SELECT for the users, then one per user when `user.posts` is touched.
+    """
+    for user in session.query(User).all():
+        len(user.posts)
+
+
+def show_user_posts_selectin():
+    """
+    Same data with `selectinload`: one SELECT for the users and one for all their posts.
+    """
+    for user in session.query(User).options(selectinload(User.posts)).all():
+        len(user.posts)
+
+
+def report(summary: dict):
+    color = Fore.RED if summary["n_plus_one"] else Fore.GREEN
+    print(color + f"{summary['trace']}: {summary['statements']} statements, {summary['db_ms']} ms in the DB")
+    for finding in summary["n_plus_one"]:
+        print(Fore.YELLOW + f"  N+1 x{finding['count']}: {finding['statement']}")
+
+
+if __name__ == "__main__":
+    if not session.query(User).count():
+        add_dummy_data()
+
+    # Summary mode: what production sampling would log for one request
+    for function in (show_user_posts, show_user_posts_selectin):
+        session.expunge_all()
+        with trace(function.__name__) as query_trace:
+            function()
+        report(query_trace.summary())
+
+    # Raise mode: what a test would use to fail on the pattern
+    session.expunge_all()
+    try:
+        with trace("show_user_posts", mode="raise"):
+            show_user_posts()
+    except NPlusOneError as exc:
+        print(Fore.RED + f"raise mode: {exc}")
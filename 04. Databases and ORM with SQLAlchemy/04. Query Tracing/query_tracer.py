@@ -0,0 +1,202 @@
+import logging
+import os
+import random
+import re
+import sys
+import time
+import warnings
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Optional
+
+import sqlalchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("query_tracer")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+# Frames a warning should skip over to reach the code that ran the query
+_INTERNAL = (os.path.dirname(sqlalchemy.__file__) + os.sep, __file__)
+
+
+class NPlusOneWarning(UserWarning):
+    """
+    The same statement ran `threshold` times in one trace with only its parameters changing.
+    """
+
+
+class NPlusOneError(Exception):
+    """
+    Raised in `raise` mode at the query that crosses the N+1 threshold.
+    """
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """
+    Statement with literals and parameter lists collapsed, so statements that differ
+    only in their parameters share a fingerprint.
+
+    ORM statements already use placeholders; this also folds inlined literals and
+    `IN (?, ?, ?)` lists of varying length. Cached, since an app issues the same few
+    statement strings over and over.
+    """
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _IN_LIST.sub("IN (?)", statement)
+    return _SPACE.sub(" ", statement).strip()
+
+
+def _user_stacklevel() -> int:
+    """
+    `stacklevel` for a warning raised in `QueryTrace.add` that points at the first frame
+    outside this module and SQLAlchemy, i.e. the line that triggered the query.
+    """
+    frame, level = sys._getframe(1), 1
+    while frame.f_back is not None and frame.f_code.co_filename.startswith(_INTERNAL):
+        frame, level = frame.f_back, level + 1
+    return level
+
+
+class QueryTrace:
+    """
+    Statements executed during one request or unit of work.
+
+    Attributes:
+        name (str): Label for the summary (e.g. "GET /users").
+        mode (str): "summary" only records; "warn" emits `NPlusOneWarning` and "raise"
+            raises `NPlusOneError` as soon as a statement reaches `threshold`.
+        threshold (int): Executions of one fingerprint that count as an N+1 pattern.
+        statements (int): Statements executed.
+        db_ns (int): Total time spent executing them.
+        by_fingerprint (dict): Fingerprint -> [executions, nanoseconds].
+    """
+
+    def __init__(self, name: str = "", mode: str = "summary", threshold: int = 5):
+        if mode not in ("summary", "warn", "raise"):
+            raise ValueError(f"unknown mode {mode!r}")
+        self.name = name
+        self.mode = mode
+        self.threshold = threshold
+        self.statements = 0
+        self.db_ns = 0
+        self.by_fingerprint: dict[str, list[int]] = {}
+
+    def add(self, statement: str, duration_ns: int) -> None:
+        key = fingerprint(statement)
+        entry = self.by_fingerprint.get(key)
+        if entry is None:
+            entry = self.by_fingerprint[key] = [0, 0]
+        entry[0] += 1
+        entry[1] += duration_ns
+        self.statements += 1
+        self.db_ns += duration_ns
+
+        if entry[0] == self.threshold and self.mode != "summary":
+            message = f"N+1 query in {self.name or 'trace'}: ran {self.threshold} times: {key}"
+            if self.mode == "raise":
+                raise NPlusOneError(message)
+            warnings.warn(message, NPlusOneWarning, stacklevel=_user_stacklevel())
+
+    def n_plus_one(self) -> list[tuple[str, int, int]]:
+        """
+        (fingerprint, executions, nanoseconds) of every statement at or over the threshold.
+        """
+        return sorted(((key, count, ns) for key, (count, ns) in self.by_fingerprint.items()
+                       if count >= self.threshold), key=lambda item: -item[1])
+
+    def summary(self) -> dict:
+        return {
+            "trace": self.name,
+            "statements": self.statements,
+            "distinct": len(self.by_fingerprint),
+            "db_ms": round(self.db_ns / 1e6, 3),
+            "n_plus_one": [{"statement": key, "count": count, "db_ms": round(ns / 1e6, 3)}
+                           for key, count, ns in self.n_plus_one()],
+        }
+
+
+# The trace statements are attributed to; None means "not tracing" and costs one lookup
+current: ContextVar[Optional[QueryTrace]] = ContextVar("query_trace", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current.get() is not None:
+        # The execution context lives exactly as long as this statement
+        context._trace_start_ns = time.perf_counter_ns()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = current.get()
+    start = getattr(context, "_trace_start_ns", None)
+    if trace is not None and start is not None:
+        trace.add(statement, time.perf_counter_ns() - start)
+
+
+def instrument(engine: Engine) -> Engine:
+    """
+    Attach the tracer to `engine`. Statements are only recorded inside `trace()`.
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    return engine
+
+
+@contextmanager
+def trace(name: str = "", mode: str = "summary", threshold: int = 5):
+    """
+    Attribute every statement run in this block (and tasks started from it) to a new
+    `QueryTrace`, which is yielded.
+
+    Example:
+        with trace("show_user_posts", mode="raise"):
+            show_user_posts()
+    """
+    query_trace = QueryTrace(name, mode, threshold)
+    token = current.set(query_trace)
+    try:
+        yield query_trace
+    finally:
+        current.reset(token)
+
+
+class QueryTraceMiddleware:
+    """
+    Pure ASGI middleware that traces a sample of HTTP requests and logs a per-request
+    summary (statement count, DB time and any N+1 patterns) to the `query_tracer` logger.
+
+    Requests that are not sampled run without a trace, so the engine hooks return after
+    a single context-variable lookup.
+
+    Args:
+        app: The wrapped ASGI app.
+        sample_rate (float): Fraction of requests to trace.
+        threshold (int): Executions of one statement that count as an N+1 pattern.
+        mode (str): Passed to `QueryTrace`; "raise" is meant for test clients.
+    """
+
+    def __init__(self, app, sample_rate: float = 0.01, threshold: int = 5, mode: str = "summary"):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.mode = mode
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        with trace(f"{scope['method']} {scope['path']}", self.mode, self.threshold) as query_trace:
+            await self.app(scope, receive, send)
+
+        summary = query_trace.summary()
+        level = logging.WARNING if summary["n_plus_one"] else logging.INFO
+        logger.log(level, "%s: %d statements, %.3f ms", query_trace.name, summary["statements"],
+                   summary["db_ms"], extra={"query_trace": summary})
@@ -0,0 +1,156 @@
+import os
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+DB_URL = os.getenv("DB_URL", "sqlite:///user.db")
+
+# Applied to every new SQLite connection
+SQLITE_PRAGMAS = {
+    # Readers never block the writer and the writer never blocks readers
+    "journal_mode": "WAL",
+    # In WAL mode NORMAL only fsyncs at checkpoints; a power cut can lose the last
+    # transactions but never corrupts the database
+    "synchronous": "NORMAL",
+    # Read pages straight from a 256 MB memory map instead of copying them through read()
+    "mmap_size": 256 * 2**20,
+    # 64 MB page cache per connection (negative values are KiB)
+    "cache_size": -64 * 1024,
+    # Wait up to 5 s for a lock instead of failing at once with "database is locked"
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
+
+
+def create_db_engine(url: str = DB_URL, echo: bool = False, read_only: bool = False,
+                     begin: str = "DEFERRED", pool_size: int = 5, max_overflow: int = 10,
+                     pool_timeout: float = 30, pragmas: Optional[dict] = None) -> Engine:
+    """
+    Build an engine with a sized connection pool and, for SQLite, tuned connections.
+
+    For SQLite every new connection gets `SQLITE_PRAGMAS` (plus `query_only` when
+    `read_only`). sqlite3's own transaction handling is switched off so SQLAlchemy
+    emits `BEGIN <begin>` itself. Writers should use `IMMEDIATE`: they then take the
+    write lock when the transaction starts and wait for it there (under
+    `busy_timeout`), instead of failing halfway through when a read lock cannot be
+    upgraded.
+
+    Args:
+        url (str): Database URL.
+        echo (bool): Log every statement; for debugging only.
+        read_only (bool): Reject writes on these connections (SQLite `query_only`).
+        begin (str): SQLite transaction mode: DEFERRED, IMMEDIATE or EXCLUSIVE.
+        pool_size (int): Connections kept open.
+        max_overflow (int): Extra connections allowed under load.
+        pool_timeout (float): Seconds to wait for a free connection.
+        pragmas (dict): Overrides for `SQLITE_PRAGMAS`.
+
+    Returns:
+        Engine: The configured engine.
+    """
+    if url.startswith("sqlite") and (url.endswith(":memory:") or url in ("sqlite://", "sqlite:///")):
+        raise ValueError("use a file database; each pooled connection would get its own in-memory one")
+
+    engine = create_engine(url, echo=echo, pool_size=pool_size, max_overflow=max_overflow,
+                           pool_timeout=pool_timeout, pool_pre_ping=not url.startswith("sqlite"))
+    if engine.dialect.name != "sqlite":
+        return engine
+
+    settings = {**SQLITE_PRAGMAS, **(pragmas or {})}
+    if read_only:
+        settings["query_only"] = "ON"
+
+    @event.listens_for(engine, "connect")
+    def configure(dbapi_connection, connection_record):
+        # Let SQLAlchemy issue BEGIN (below) instead of sqlite3's implicit, late one
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in settings.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def begin_transaction(conn):
+        conn.exec_driver_sql(f"BEGIN {begin}")
+
+    return engine
+
+
+class Database:
+    """
+    Engines and session factories for one database, built once and shared.
+
+    With `split=False` one pooled engine serves everything. With `split=True` (SQLite)
+    writes go through a single-connection writer engine that starts transactions with
+    `BEGIN IMMEDIATE`. Reads use a pool of `readers` read-only connections. SQLite only
+    ever runs one writer at a time, so concurrent writers queue in the pool instead of
+    contending for the file lock. WAL lets the readers run alongside the writer.
+
+    Attributes:
+        writer (Engine): Engine for read/write sessions.
+        reader (Engine): Engine for read-only sessions (the writer when not split).
+        Session (sessionmaker): Read/write session factory.
+        ReadSession (sessionmaker): Read-only session factory.
+    """
+
+    def __init__(self, url: str = DB_URL, split: bool = False, readers: int = 4, echo: bool = False):
+        if split:
+            self.writer = create_db_engine(url, echo=echo, begin="IMMEDIATE", pool_size=1, max_overflow=0)
+            self.reader = create_db_engine(url, echo=echo, read_only=True, pool_size=readers, max_overflow=0)
+        else:
+            self.writer = self.reader = create_db_engine(url, echo=echo)
+        # Objects stay readable after commit without a reload query
+        self.Session = sessionmaker(bind=self.writer, expire_on_commit=False)
+        self.ReadSession = sessionmaker(bind=self.reader)
+
+    @contextmanager
+    def session(self) -> Iterator[Session]:
+        """
+        Read/write session in a transaction, committed on success and rolled back on error.
+        """
+        with self.Session() as session, session.begin():
+            yield session
+
+    @contextmanager
+    def read_session(self) -> Iterator[Session]:
+        with self.ReadSession() as session:
+            yield session
+
+    def dispose(self) -> None:
+        self.writer.dispose()
+        if self.reader is not self.writer:
+            self.reader.dispose()
+
+
+_database: Optional[Database] = None
+
+
+def get_database() -> Database:
+    """
+    The process-wide Database, built on first use from DB_URL, DB_SPLIT and DB_READERS.
+    """
+    global _database
+    if _database is None:
+        _database = Database(DB_URL, split=os.getenv("DB_SPLIT", "0") == "1",
+                             readers=int(os.getenv("DB_READERS", "4")), echo=os.getenv("DB_ECHO", "0") == "1")
+    return _database
+
+
+def get_db() -> Iterator[Session]:
+    """
+    FastAPI dependency yielding a read/write session for one request.
+    """
+    with get_database().session() as session:
+        yield session
+
+
+def get_read_db() -> Iterator[Session]:
+    """
+    FastAPI dependency yielding a read-only session for one request.
+    """
+    with get_database().read_session() as session:
+        yield session
@@ -0,0 +1,151 @@
+import argparse
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+
+from colorama import Fore, init
+from sqlalchemy import ForeignKey, String, create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
+
+from db import Database
+
+init(autoreset=True)
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class User(Base):
+    __tablename__ = "users"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    username: Mapped[str] = mapped_column(String)
+
+
+class Post(Base):
+    __tablename__ = "posts"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    content: Mapped[str] = mapped_column(String)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
+
+
+class CurrentSetup:
+    """
+    What the ORM examples do today: `create_engine(url, echo=True)` with default
+    journal, pool and transaction handling. Each thread gets its own session (the
+    examples' single global session is not safe to share between threads), and echo
+    output goes to /dev/null so the terminal is not the bottleneck.
+    """
+
+    def __init__(self, url: str):
+        self.writer = self.reader = create_engine(url, echo=True)
+        logging.getLogger("sqlalchemy.engine.Engine").handlers = [logging.StreamHandler(open(os.devnull, "w"))]
+        self.Session = self.ReadSession = sessionmaker(bind=self.writer)
+
+    def dispose(self):
+        self.writer.dispose()
+
+
+def seed(url: str, users: int, posts_per_user: int):
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": i, "username": f"user{i}"} for i in range(1, users + 1)])
+        conn.execute(insert(Post), [{"content": f"post {n} of user {i}", "user_id": i}
+                                    for i in range(1, users + 1) for n in range(posts_per_user)])
+    engine.dispose()
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(database, users: int, readers: int, writers: int, duration: float) -> dict:
+    """
+    `readers` threads load a random user and their posts; `writers` threads insert a
+    post per transaction. Each operation opens its own session, as a request would.
+    """
+    read_latencies: list[float] = []
+    write_latencies: list[float] = []
+    errors = [0]
+    stop = time.perf_counter() + duration
+
+    def reader():
+        rng = random.Random()
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            try:
+                with database.ReadSession() as session:
+                    user_id = rng.randint(1, users)
+                    session.get(User, user_id)
+                    session.scalars(select(Post).where(Post.user_id == user_id)).all()
+                read_latencies.append(time.perf_counter() - start)
+            except OperationalError:
+                errors[0] += 1
+
+    def writer():
+        rng = random.Random()
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            try:
+                with database.Session() as session:
+                    session.add(Post(content="new post", user_id=rng.randint(1, users)))
+                    session.commit()
+                write_latencies.append(time.perf_counter() - start)
+            except OperationalError:
+                errors[0] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "reads": len(read_latencies) / duration,
+        "writes": len(write_latencies) / duration,
+        "read_p99": percentile(read_latencies, 99),
+        "write_p99": percentile(write_latencies, 99),
+        "errors": errors[0],
+    }
+
+
+SETUPS = {
+    "current": lambda url, readers: CurrentSetup(url),
+    "wal": lambda url, readers: Database(url),
+    "wal+split": lambda url, readers: Database(url, split=True, readers=readers),
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent read/write throughput of the engine setups.")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--posts-per-user", type=int, default=10)
+    parser.add_argument("--setups", nargs="+", choices=SETUPS, default=list(SETUPS))
+    args = parser.parse_args()
+
+    print(Fore.BLUE + f"{args.readers} readers, {args.writers} writers, {args.duration:.0f} s per setup")
+    print(Fore.BLUE + f"{'setup':<12} {'reads/s':>9} {'writes/s':>9} {'read p99 ms':>12} {'write p99 ms':>13} {'errors':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.setups:
+            # A fresh file per setup, so journal mode and size start out the same
+            url = f"sqlite:///{os.path.join(directory, f'{name}.db')}"
+            seed(url, args.users, args.posts_per_user)
+            database = SETUPS[name](url, args.readers)
+            result = run(database, args.users, args.readers, args.writers, args.duration)
+            database.dispose()
+            print(f"{name:<12} {result['reads']:>9.0f} {result['writes']:>9.0f} {result['read_p99'] * 1000:>12.1f}"
+                  f" {result['write_p99'] * 1000:>13.1f} {result['errors']:>7}")
@@ -0,0 +1,37 @@
+import argparse
+import os
+
+from colorama import Fore, init
+from sqlalchemy import create_engine
+
+from seeds import SCHEMAS, seed
+
+init(autoreset=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-seed one of the example schemas with Faker data.")
+    parser.add_argument("schema", choices=SCHEMAS)
+    parser.add_argument("--parents", type=int, default=1_000_000, help="Rows in the parent table")
+    parser.add_argument("--fanout", type=int, help="Child rows per parent (default depends on the schema)")
+    parser.add_argument("--db", default=os.getenv("SEED_DB_URL", "sqlite:///seed.db"))
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=5_000, help="Parents per generated chunk")
+    parser.add_argument("--seed", type=int, default=0, help="Same seed, same data")
+    parser.add_argument("--pool-size", type=int, default=5_000, help="Faker values generated per field")
+    args = parser.parse_args()
+
+    engine = create_engine(args.db)
+    print(Fore.BLUE + f"seeding {args.schema} into {args.db} with {args.workers} workers")
+
+    def progress(rows: int) -> None:
+        print(f"\r{rows:,} rows", end="", flush=True)
+
+    result = seed(engine, args.schema, args.parents, args.fanout, workers=args.workers,
+                  chunk=args.chunk, seed=args.seed, pool_size=args.pool_size,
+                  progress=progress)
+    print()
+    for table, rows in result["tables"].items():
+        print(f"  {table:<24} {rows:>12,}")
+    print(Fore.GREEN + f"{result['rows']:,} rows in {result['seconds']:.1f} s"
+                       f" ({result['rows_per_second']:,.0f} rows/s)")
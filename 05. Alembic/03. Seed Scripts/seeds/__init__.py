@@ -0,0 +1,4 @@
+from .loader import BULK_PRAGMAS, seed
+from .schemas import SCHEMAS, FakerPools, Schema
+
+__all__ = ["BULK_PRAGMAS", "FakerPools", "SCHEMAS", "Schema", "seed"]
@@ -0,0 +1,164 @@
+from functools import cached_property
+from random import Random
+from typing import Callable, NamedTuple
+
+from faker import Faker
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, String, Table
+
+
+class FakerPools:
+    """
+    Faker values generated once per worker process and sampled per row.
+
+    A Faker call costs 20-200 us (`user_name` is the slowest), which at 10M rows is
+    hours of CPU. Drawing from a few thousand pre-generated values costs well under a
+    microsecond and still gives realistic-looking rows; values that must be unique get
+    the row id appended. Each pool is built on first use from `seed` alone, so every
+    worker builds the same pools.
+
+    Args:
+        seed (int): Faker seed for the pools.
+        size (int): Values per pool.
+    """
+
+    def __init__(self, seed: int = 0, size: int = 5_000):
+        self.seed = seed
+        self.size = size
+
+    def _pool(self, provider: str, size: int = 0) -> list[str]:
+        fake = Faker()
+        fake.seed_instance(self.seed)
+        method = getattr(fake, provider)
+        return [method() for _ in range(size or self.size)]
+
+    @cached_property
+    def user_names(self) -> list[str]:
+        return self._pool("user_name")
+
+    @cached_property
+    def domains(self) -> list[str]:
+        return self._pool("free_email_domain", 50)
+
+    @cached_property
+    def sentences(self) -> list[str]:
+        return self._pool("sentence")
+
+    @cached_property
+    def cities(self) -> list[str]:
+        return self._pool("city")
+
+    @cached_property
+    def states(self) -> list[str]:
+        return self._pool("state", 100)
+
+    @cached_property
+    def zip_codes(self) -> list[str]:
+        return self._pool("zipcode")
+
+
+# Row generator: (pools, rng, first parent id, last parent id + 1, total parents, fanout)
+# -> {table name: [row tuple, ...]} with columns in table order
+Generator = Callable[[FakerPools, Random, int, int, int, int], dict[str, list[tuple]]]
+
+
+class Schema(NamedTuple):
+    """
+    One seedable schema: its tables (in insert order) and the function generating the
+    rows that belong to a range of parent ids.
+
+    Attributes:
+        metadata (MetaData): Tables of the schema.
+        tables (list[str]): Table names in foreign-key order.
+        generate (Generator): Row generator for a chunk of parents.
+        fanout (int): Default child rows per parent.
+    """
+    metadata: MetaData
+    tables: list[str]
+    generate: Generator
+    fanout: int
+
+
+# Core mirrors of the ORM models in "04. Databases and ORM with SQLAlchemy"; those
+# modules create engines and drop tables on import, so they cannot be imported here.
+
+users_posts = MetaData()
+Table("users", users_posts,
+      Column("id", Integer, primary_key=True),
+      Column("username", String))
+Table("posts", users_posts,
+      Column("id", Integer, primary_key=True),
+      Column("content", String),
+      Column("user_id", Integer, ForeignKey("users.id"), index=True))
+
+employees_addresses = MetaData()
+Table("employees", employees_addresses,
+      Column("id", Integer, primary_key=True),
+      Column("username", String),
+      Column("email", String),
+      Column("manager_id", Integer, ForeignKey("employees.id"), nullable=True))
+Table("addresses", employees_addresses,
+      Column("id", Integer, primary_key=True),
+      Column("employee_id", Integer, ForeignKey("employees.id")),
+      Column("city", String),
+      Column("state", String),
+      Column("zip_code", String))
+
+following = MetaData()
+Table("users", following,
+      Column("id", Integer, primary_key=True),
+      Column("username", String),
+      Column("email", String))
+Table("following_associations", following,
+      Column("id", Integer, primary_key=True),
+      Column("user_id", Integer, ForeignKey("users.id")),
+      Column("following_id", Integer, ForeignKey("users.id")))
+
+
+# Child ids are derived from the parent id, so every chunk can be generated on its own
+# and the result does not depend on which worker produced it
+
+def generate_users_posts(pools, rng, start, end, total, fanout):
+    choice, names, sentences = rng.choice, pools.user_names, pools.sentences
+    users = [(i, f"{choice(names)}{i}") for i in range(start, end)]
+    posts = [((i - 1) * fanout + n + 1, choice(sentences), i) for i in range(start, end) for n in range(fanout)]
+    return {"users": users, "posts": posts}
+
+
+def generate_employees_addresses(pools, rng, start, end, total, fanout):
+    choice, names, domains = rng.choice, pools.user_names, pools.domains
+    employees = []
+    for i in range(start, end):
+        username = f"{choice(names)}{i}"
+        # Managers always have a smaller id, so the hierarchy has no cycles
+        employees.append((i, username, f"{username}@{choice(domains)}", rng.randrange(1, i) if i > 1 else None))
+    cities, states, zip_codes = pools.cities, pools.states, pools.zip_codes
+    addresses = [((i - 1) * fanout + n + 1, i, choice(cities), choice(states), choice(zip_codes))
+                 for i in range(start, end) for n in range(fanout)]
+    return {"employees": employees, "addresses": addresses}
+
+
+def generate_following(pools, rng, start, end, total, fanout):
+    choice, names, domains = rng.choice, pools.user_names, pools.domains
+    users = []
+    for i in range(start, end):
+        username = f"{choice(names)}{i}"
+        users.append((i, username, f"{username}@{choice(domains)}"))
+    follows = []
+    for i in range(start, end):
+        followed = set()
+        # Distinct users other than i (fewer if there are not enough users)
+        while len(followed) < min(fanout, total - 1):
+            other = rng.randint(1, total)
+            if other != i:
+                followed.add(other)
+        base = (i - 1) * fanout
+        follows.extend((base + n + 1, i, other) for n, other in enumerate(sorted(followed)))
+    return {"users": users, "following_associations": follows}
+
+
+SCHEMAS = {
+    "users_posts": Schema(users_posts, ["users", "posts"], generate_users_posts, 9),
+    "employees_addresses": Schema(employees_addresses, ["employees", "addresses"],
+                                  generate_employees_addresses, 2),
+    "following": Schema(following, ["users", "following_associations"], generate_following, 10),
+}
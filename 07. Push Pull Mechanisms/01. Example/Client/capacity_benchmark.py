@@ -0,0 +1,187 @@
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+import websockets
+from colorama import Fore, init
+
+from client import BASE_URL, WS_URL, create_client, poll_events, sse_events
+from load_generator import percentile
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+init(autoreset=True)
+
+KINDS = ("poll", "sse", "ws")
+
+
+class Probe:
+    """
+    Publish times of the probe messages and the delivery latencies seen by subscribers.
+    """
+
+    def __init__(self):
+        self.sent: dict[int, float] = {}
+        self.latencies: list[float] = []
+
+    def receive(self, payload: str) -> None:
+        try:
+            n = json.loads(payload)["probe"]
+        except (ValueError, KeyError, TypeError):
+            return  # The SSE clock or a message from another client
+        if n in self.sent:
+            self.latencies.append(time.perf_counter() - self.sent[n])
+
+
+# -------------------------------
+# Parked connections
+# -------------------------------
+async def park_poll(client: httpx.AsyncClient, probe: Probe):
+    res = await client.get("/poll", params={"cursor": 2**62})
+    async for events, _ in poll_events(client, res.json()["cursor"]):
+        for event in events:
+            probe.receive(event["message"])
+
+
+async def park_sse(client: httpx.AsyncClient, probe: Probe):
+    async for _, data in sse_events(client):
+        probe.receive(data)
+
+
+async def park_ws(client: httpx.AsyncClient, probe: Probe):
+    async with websockets.connect(WS_URL, ping_interval=None) as socket:
+        await socket.send(json.dumps({"action": "subscribe", "room": "updates"}))
+        async for raw in socket:
+            frame = json.loads(raw)
+            if frame["type"] == "ping":
+                await socket.send(json.dumps({"action": "pong"}))
+            elif frame["type"] == "message":
+                probe.receive(frame["message"])
+            elif frame["type"] == "batch":
+                for message in frame["messages"]:
+                    probe.receive(message)
+
+
+PARKERS = {"poll": park_poll, "sse": park_sse, "ws": park_ws}
+
+
+# -------------------------------
+# Driver
+# -------------------------------
+async def server_stats(client: httpx.AsyncClient) -> dict:
+    return (await client.get("/stats")).json()
+
+
+async def wait_parked(client: httpx.AsyncClient, kind: str, count: int, timeout: float,
+                      at_most: bool = False) -> dict:
+    """
+    Wait until the server reports at least `count` parked connections of `kind` (or,
+    with `at_most`, no more than `count`), or until `timeout` seconds have passed.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        stats = await server_stats(client)
+        parked = stats["connections"][kind]
+        if (parked <= count if at_most else parked >= count) or time.monotonic() > deadline:
+            return stats
+        await asyncio.sleep(0.2)
+
+
+async def ramp(client: httpx.AsyncClient, kind: str, args: argparse.Namespace) -> list[dict]:
+    """
+    Add parked connections of one kind step by step, measuring at each step.
+    """
+    tasks: list[asyncio.Task] = []
+    probe = Probe()
+    rows = []
+    baseline = (await server_stats(client))["rss"]
+    probe_id = 0
+
+    try:
+        for step in args.steps:
+            while len(tasks) < step:
+                tasks.append(asyncio.create_task(PARKERS[kind](client, probe)))
+            stats = await wait_parked(client, kind, step, args.connect_timeout)
+            parked = stats["connections"][kind]
+
+            probe.latencies.clear()
+            for _ in range(args.probes):
+                probe.sent[probe_id] = time.perf_counter()
+                await client.post("/update", json={"message": json.dumps({"probe": probe_id})})
+                probe_id += 1
+                await asyncio.sleep(args.probe_gap)
+            await asyncio.sleep(args.drain)
+
+            stats = await server_stats(client)
+            # The server reports no RSS where it cannot measure it (Windows)
+            rss = stats["rss"] if stats["rss"] is not None else float("nan")
+            rows.append({
+                "kind": kind,
+                "parked": parked,
+                "rss_mb": rss / 2**20,
+                "bytes_per_conn": (rss - (baseline or 0)) / parked if parked else 0,
+                "lag_ms": stats["loop_lag_ms"]["peak"],
+                "p50_ms": percentile(probe.latencies, 50) * 1000,
+                "p99_ms": percentile(probe.latencies, 99) * 1000,
+                "delivered": len(probe.latencies) / (args.probes * parked) if parked else 0,
+            })
+            report_row(rows[-1])
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Let the server notice the disconnects before the next kind is measured
+        stats = await wait_parked(client, kind, 0, args.connect_timeout, at_most=True)
+        if stats["connections"][kind]:
+            print(Fore.YELLOW + f"{stats['connections'][kind]} {kind} connections still parked after"
+                                f" {args.connect_timeout:.0f} s")
+
+    return rows
+
+
+def report_row(row: dict) -> None:
+    print(
+        f"{row['kind']:<5} {row['parked']:>7} {row['rss_mb']:>9.1f} {row['bytes_per_conn']:>10.0f}"
+        f" {row['lag_ms']:>8.2f} {row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['delivered']:>9.1%}"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    async with create_client() as client:
+        print(Fore.BLUE + f"{'kind':<5} {'parked':>7} {'rss MB':>9} {'B/conn':>10} {'lag ms':>8} {'p50 ms':>8} {'p99 ms':>8} {'delivered':>9}")
+        for kind in args.kinds:
+            await ramp(client, kind, args)
+
+
+def raise_fd_limit() -> None:
+    """
+    Every parked connection is a socket; lift the soft descriptor limit to the hard one.
+    """
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Ramp parked connections against one server worker (run it with --workers 1, "
+                    "since /stats reports the worker that answers).")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS), help="Connection types to ramp")
+    parser.add_argument("--steps", nargs="+", type=int, default=[100, 500, 1000, 2000, 5000],
+                        help="Parked connection counts to measure at")
+    parser.add_argument("--probes", type=int, default=5, help="Updates published per step")
+    parser.add_argument("--probe-gap", type=float, default=0.2, help="Seconds between probe updates")
+    parser.add_argument("--connect-timeout", type=float, default=60, help="Seconds to wait for a step to connect")
+    parser.add_argument("--drain", type=float, default=1, help="Seconds to wait for deliveries")
+    args = parser.parse_args()
+
+    raise_fd_limit()
+    print(f"Target: {BASE_URL}")
+    asyncio.run(run(args))
@@ -1,56 +1,114 @@
 import websockets
 import asyncio
-import sseclient
+import httpx
+import json
 from colorama import Fore, init
-import requests
-import time
+from typing import AsyncIterator, Callable, Optional
 
 init(autoreset=True)
 
-async def ws_connect():
-    uri="ws://localhost:8000/ws"
-    socket = await websockets.connect(uri)
-    try:
-        while True:
-            print("Connected to server")
-            msg = input("client >>")
-            await socket.send(msg)
-            response = await socket.recv()
-            if response == "break":
-                break
-            print(Fore.BLUE + f"Server >> {response}")
-    finally:
-        await socket.close()
-    
-        
-async def long_polling():
-    last_seen = 0
-    
+BASE_URL = "http://localhost:8000"
+WS_URL = "ws://localhost:8000/ws"
+
+
+def create_client() -> httpx.AsyncClient:
+    """
+    Shared, pooled HTTP client. Long-polls and streams are held open for a long time,
+    so the read timeout is disabled and the pool sized for many concurrent requests.
+    """
+    return httpx.AsyncClient(
+        base_url=BASE_URL,
+        timeout=httpx.Timeout(10.0, read=None),
+        limits=httpx.Limits(max_connections=None, max_keepalive_connections=100),
+    )
+
+
+async def ws_connect(room: str = "chat"):
+    """
+    Join a room and chat: typed lines are published, room messages are printed.
+    """
+    async with websockets.connect(WS_URL) as socket:
+        print("Connected to server")
+        await socket.send(json.dumps({"action": "subscribe", "room": room}))
+
+        async def receive():
+            async for raw in socket:
+                frame = json.loads(raw)
+                if frame["type"] == "ping":
+                    await socket.send(json.dumps({"action": "pong"}))
+                elif frame["type"] == "batch":
+                    for message in frame["messages"]:
+                        print(Fore.BLUE + f"Server >> {message}")
+                else:
+                    print(Fore.BLUE + f"Server >> {frame}")
+
+        receiver = asyncio.create_task(receive())
+        try:
+            while True:
+                # Read stdin in a thread so the receive loop keeps running
+                msg = await asyncio.to_thread(input, "client >>")
+                if msg == "break":
+                    break
+                await socket.send(json.dumps({"action": "publish", "room": room, "message": msg}))
+        finally:
+            receiver.cancel()
+
+
+async def poll_events(client: httpx.AsyncClient, cursor: int = 0) -> AsyncIterator[tuple[list[dict], bool]]:
+    """
+    Long-poll `/poll` forever, yielding each batch of events and its resync flag.
+    """
     while True:
-        res = requests.get("http://localhost:8000/poll", params={"last_seen": last_seen})
+        res = await client.get("/poll", params={"cursor": cursor})
         data = res.json()
-        
-        if data:
-            print(f"New message: {data["message"]}")
-            last_seen = data["timestamp"]
-            
-        else:
-            print("No new messages")
-            
-        time.sleep(1)
+        cursor = data["cursor"]
+        yield data["events"], data["resync"]
+
+
+async def sse_events(client: httpx.AsyncClient, last_event_id: int | None = None,
+                     on_open: Optional[Callable[[], None]] = None) -> AsyncIterator[tuple[str | None, str]]:
+    """
+    Subscribe to `/stream` and yield (event id, data) for every SSE event.
+
+    `on_open` is called once the response headers have arrived, i.e. when the stream is
+    established, before the first event (which may be up to a clock tick later).
+    """
+    headers = {"Last-Event-ID": str(last_event_id)} if last_event_id is not None else {}
+    async with client.stream("GET", "/stream", headers=headers) as res:
+        if on_open is not None:
+            on_open()
+        event_id, data = None, []
+        async for line in res.aiter_lines():
+            if not line:
+                if data:
+                    yield event_id, "\n".join(data)
+                event_id, data = None, []
+            elif line.startswith("id:"):
+                event_id = line[3:].strip()
+            elif line.startswith("data:"):
+                data.append(line[5:].lstrip())
+
+
+async def long_polling():
+    async with create_client() as client:
+        async for events, resync in poll_events(client):
+            if resync:
+                print("Fell behind the server, some messages were missed")
+
+            if events:
+                for event in events:
+                    print(f"New message: {event['message']}")
+            else:
+                print("No new messages")
 
 
 async def get_stream():
-    res = requests.get("http://localhost:8000/stream", stream=True)
-    client = sseclient.SSEClient(res) # type: ignore
-    
-    try:
-        for event in client.events():
-            print("Received:", event.data)
-    finally:
-        client.close()
+    async with create_client() as client:
+        async for _, data in sse_events(client):
+            print("Received:", data)
+
 
 if __name__ == "__main__":
     # asyncio.run(ws_connect())
+    # asyncio.run(long_polling())
     asyncio.run(get_stream())
-        
\ No newline at end of file
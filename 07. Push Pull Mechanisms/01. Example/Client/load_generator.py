@@ -0,0 +1,165 @@
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+import websockets
+from colorama import Fore, init
+
+from client import BASE_URL, WS_URL, create_client, poll_events, sse_events
+
+init(autoreset=True)
+
+
+class Stats:
+    """
+    Results for one connection type: connect times, delivery latencies and receipts.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.connect_times: list[float] = []
+        self.latencies: list[float] = []
+        self.received: list[set[int]] = []
+        self.errors = 0
+
+    def subscriber(self) -> set[int]:
+        """
+        Register one subscriber and return the set it records message numbers in.
+        """
+        seen: set[int] = set()
+        self.received.append(seen)
+        return seen
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def record(stats: Stats, seen: set[int], payload: str, sent: dict[int, float]) -> None:
+    """
+    Record one delivered load-test message (a JSON body with its sequence number `n`).
+    """
+    try:
+        n = json.loads(payload)["n"]
+    except (ValueError, KeyError, TypeError):
+        return  # Not one of ours, e.g. the SSE clock
+    if n in sent and n not in seen:
+        seen.add(n)
+        stats.latencies.append(time.perf_counter() - sent[n])
+
+
+# -------------------------------
+# Subscribers
+# -------------------------------
+async def long_poller(client: httpx.AsyncClient, stats: Stats, sent: dict[int, float]):
+    seen = stats.subscriber()
+    start = time.perf_counter()
+    # A cursor from the future returns at once with resync and the current cursor,
+    # which both measures connect time and skips any backlog from earlier runs
+    res = await client.get("/poll", params={"cursor": 2**62})
+    stats.connect_times.append(time.perf_counter() - start)
+    async for events, _ in poll_events(client, res.json()["cursor"]):
+        for event in events:
+            record(stats, seen, event["message"], sent)
+
+
+async def sse_subscriber(client: httpx.AsyncClient, stats: Stats, sent: dict[int, float]):
+    seen = stats.subscriber()
+    start = time.perf_counter()
+
+    def opened():
+        # Headers received: connected, like the WebSocket handshake below. The first
+        # frame only comes with the server's next clock tick.
+        stats.connect_times.append(time.perf_counter() - start)
+
+    async for _, data in sse_events(client, on_open=opened):
+        record(stats, seen, data, sent)
+
+
+async def ws_subscriber(stats: Stats, sent: dict[int, float]):
+    seen = stats.subscriber()
+    start = time.perf_counter()
+    async with websockets.connect(WS_URL) as socket:
+        stats.connect_times.append(time.perf_counter() - start)
+        await socket.send(json.dumps({"action": "subscribe", "room": "updates"}))
+        async for raw in socket:
+            frame = json.loads(raw)
+            if frame["type"] == "ping":
+                await socket.send(json.dumps({"action": "pong"}))
+            elif frame["type"] == "message":
+                record(stats, seen, frame["message"], sent)
+            elif frame["type"] == "batch":
+                for message in frame["messages"]:
+                    record(stats, seen, message, sent)
+
+
+# -------------------------------
+# Driver
+# -------------------------------
+async def run(args: argparse.Namespace) -> list[Stats]:
+    sent: dict[int, float] = {}
+    polls, streams, sockets = Stats("long-poll"), Stats("sse"), Stats("websocket")
+
+    async with create_client() as client:
+        tasks = [(polls, asyncio.create_task(long_poller(client, polls, sent))) for _ in range(args.pollers)]
+        tasks += [(streams, asyncio.create_task(sse_subscriber(client, streams, sent))) for _ in range(args.sse)]
+        tasks += [(sockets, asyncio.create_task(ws_subscriber(sockets, sent))) for _ in range(args.ws)]
+
+        # Give every subscriber time to connect before publishing
+        expected = args.pollers + args.sse + args.ws
+        deadline = time.monotonic() + args.connect_timeout
+        while time.monotonic() < deadline:
+            if sum(len(s.connect_times) for s in (polls, streams, sockets)) >= expected:
+                break
+            await asyncio.sleep(0.1)
+
+        for n in range(args.updates):
+            sent[n] = time.perf_counter()
+            await client.post("/update", json={"message": json.dumps({"n": n})})
+            await asyncio.sleep(1 / args.rate)
+
+        await asyncio.sleep(args.drain)
+        for _, task in tasks:
+            task.cancel()
+        results = await asyncio.gather(*(task for _, task in tasks), return_exceptions=True)
+        for (stats, _), result in zip(tasks, results):
+            if isinstance(result, Exception):
+                stats.errors += 1
+
+    return [polls, streams, sockets]
+
+
+def report(results: list[Stats], updates: int) -> None:
+    print(Fore.BLUE + f"{'type':<10} {'subs':>6} {'connect p50':>12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'missed':>8} {'errors':>7}")
+    for stats in results:
+        if not stats.received:
+            continue
+        missed = sum(updates - len(seen) for seen in stats.received)
+        connect = percentile(stats.connect_times, 50) * 1000
+        print(
+            f"{stats.name:<10} {len(stats.received):>6} {connect:>10.2f}ms"
+            f" {percentile(stats.latencies, 50) * 1000:>8.2f}"
+            f" {percentile(stats.latencies, 95) * 1000:>8.2f}"
+            f" {percentile(stats.latencies, 99) * 1000:>8.2f}"
+            f" {missed:>8} {stats.errors:>7}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load generator for the push/pull example server.")
+    parser.add_argument("--pollers", type=int, default=100, help="Concurrent long-pollers")
+    parser.add_argument("--sse", type=int, default=100, help="Concurrent SSE subscribers")
+    parser.add_argument("--ws", type=int, default=100, help="Concurrent WebSocket clients")
+    parser.add_argument("--updates", type=int, default=50, help="Messages to publish via /update")
+    parser.add_argument("--rate", type=float, default=10, help="Updates per second")
+    parser.add_argument("--connect-timeout", type=float, default=30, help="Seconds to wait for subscribers")
+    parser.add_argument("--drain", type=float, default=2, help="Seconds to wait for stragglers")
+    args = parser.parse_args()
+
+    print(f"Target: {BASE_URL}")
+    report(asyncio.run(run(args)), args.updates)
@@ -0,0 +1,177 @@
+from collections import deque
+from typing import AsyncIterator, Literal, Optional
+
+from frame_queue import FrameQueue
+from framing import FORMATS, JSON, encode_sse_data
+
+DROP_OLDEST = "drop_oldest"
+DISCONNECT = "disconnect"
+
+SlowConsumerPolicy = Literal["drop_oldest", "disconnect"]
+
+
+def encode_sse(data: str, event_id: Optional[int] = None, fmt: str = JSON) -> bytes:
+    """
+    Encode a payload as one Server-Sent Events frame.
+
+    Args:
+        data (str): Event payload. Multi-line payloads become several `data:` lines.
+        event_id (Optional[int]): Sequence ID sent as the `id:` field, if any.
+        fmt (str): "json" sends the payload as-is, "msgpack" as base64-encoded msgpack.
+
+    Returns:
+        bytes: The encoded frame, terminated by a blank line.
+    """
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.extend(f"data: {line}" for line in encode_sse_data(fmt, data).split("\n"))
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+class Subscriber:
+    """
+    One connected SSE client: a bounded queue of pre-encoded frames.
+    """
+    __slots__ = ("queue", "closed")
+
+    def __init__(self, maxsize: int):
+        # Holds encoded frames, or None telling the stream to end
+        self.queue = FrameQueue(maxsize)
+        self.closed = False
+
+
+class ReplayEntry:
+    """
+    An ID'd event kept for replay, with its frames encoded on first use per format.
+    """
+    __slots__ = ("event_id", "data", "frames")
+
+    def __init__(self, event_id: int, data: str, frames: dict[str, bytes]):
+        self.event_id = event_id
+        self.data = data
+        self.frames = frames
+
+    def frame(self, fmt: str) -> bytes:
+        frame = self.frames.get(fmt)
+        if frame is None:
+            frame = self.frames[fmt] = encode_sse(self.data, self.event_id, fmt)
+        return frame
+
+
+class BroadcastHub:
+    """
+    Fan-out hub that encodes every event once per format that has subscribers and shares
+    the frame with all of them. Formats nobody is subscribed to are not encoded; replay
+    encodes them on demand.
+
+    Each subscriber gets a bounded queue. When a queue is full the slow-consumer policy
+    decides whether the oldest queued frame is dropped or the subscriber is disconnected.
+    ID'd frames are also kept in a replay buffer so reconnecting clients can resume from
+    their `Last-Event-ID`.
+
+    Attributes:
+        queue_size (int): Maximum frames buffered per subscriber.
+        policy (SlowConsumerPolicy): "drop_oldest" or "disconnect".
+    """
+
+    def __init__(self, queue_size: int = 256, replay_size: int = 1024,
+                 policy: SlowConsumerPolicy = DROP_OLDEST):
+        self.queue_size = queue_size
+        self.policy = policy
+        self.subscribers: dict[str, set[Subscriber]] = {fmt: set() for fmt in FORMATS}
+        self._replay: deque[ReplayEntry] = deque(maxlen=replay_size)
+
+    def __len__(self) -> int:
+        return sum(len(subscribers) for subscribers in self.subscribers.values())
+
+    def publish(self, data: str, event_id: Optional[int] = None) -> None:
+        """
+        Encode an event once per format in use and enqueue the frames for every subscriber.
+
+        Args:
+            data (str): Event payload.
+            event_id (Optional[int]): Sequence ID; ID'd events are kept for replay.
+        """
+        frames = self._encode(data, event_id)
+        for fmt, frame in frames.items():
+            for subscriber in list(self.subscribers[fmt]):
+                self._offer(subscriber, frame)
+
+    def publish_many(self, events: list[tuple[str, Optional[int]]]) -> None:
+        """
+        Publish a batch of (data, event_id) events as one write per subscriber.
+
+        Each event keeps its own SSE frame and ID (so replay and `Last-Event-ID` work as
+        usual), but the frames are concatenated and queued as a single chunk.
+        """
+        batch = [self._encode(data, event_id) for data, event_id in events]
+        for fmt, subscribers in self.subscribers.items():
+            if subscribers:
+                chunk = b"".join(frames[fmt] for frames in batch)
+                for subscriber in list(subscribers):
+                    self._offer(subscriber, chunk)
+
+    def _encode(self, data: str, event_id: Optional[int]) -> dict[str, bytes]:
+        """
+        Encode an event for the formats that currently have subscribers and keep ID'd
+        events for replay (sharing the frames, so replay reuses them).
+        """
+        frames = {fmt: encode_sse(data, event_id, fmt) for fmt in FORMATS if self.subscribers[fmt]}
+        if event_id is not None:
+            self._replay.append(ReplayEntry(event_id, data, frames))
+        return frames
+
+    def _offer(self, subscriber: Subscriber, frame: bytes) -> None:
+        """
+        Enqueue a frame for one subscriber, applying the slow-consumer policy if full.
+        """
+        queue = subscriber.queue
+        if queue.full():
+            if self.policy == DISCONNECT:
+                self._disconnect(subscriber)
+                return
+            queue.get_nowait()
+        queue.put_nowait(frame)
+
+    def _disconnect(self, subscriber: Subscriber) -> None:
+        """
+        Drop a subscriber's backlog and wake its stream with the close sentinel.
+        """
+        for subscribers in self.subscribers.values():
+            subscribers.discard(subscriber)
+        subscriber.closed = True
+        subscriber.queue.clear()
+        subscriber.queue.put_nowait(None)
+
+    def replay_since(self, last_event_id: int, fmt: str = JSON) -> list[bytes]:
+        """
+        Return the buffered frames with an ID greater than `last_event_id`.
+        """
+        return [entry.frame(fmt) for entry in self._replay if entry.event_id > last_event_id]
+
+    async def stream(self, last_event_id: Optional[int] = None, fmt: str = JSON) -> AsyncIterator[bytes]:
+        """
+        Subscribe and yield frames until the client goes away or is disconnected.
+
+        Args:
+            last_event_id (Optional[int]): ID from the client's `Last-Event-ID` header.
+                Frames after it are replayed before live events.
+            fmt (str): Payload encoding, "json" or "msgpack".
+
+        Yields:
+            bytes: Encoded SSE frames.
+        """
+        subscriber = Subscriber(self.queue_size)
+        # No await between the replay snapshot and registration, so nothing is missed
+        backlog = self.replay_since(last_event_id, fmt) if last_event_id is not None else []
+        subscribers = self.subscribers[fmt]
+        subscribers.add(subscriber)
+        try:
+            for frame in backlog:
+                yield frame
+            while True:
+                frame = await subscriber.queue.get()
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            subscribers.discard(subscriber)
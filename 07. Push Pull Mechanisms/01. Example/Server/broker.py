@@ -0,0 +1,256 @@
+import asyncio
+import itertools
+import json
+import os
+import socket
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+# Called with every delivered message: {"channel": str, "seq": int, "data": dict}
+Deliver = Callable[[dict], None]
+
+
+class Broker(ABC):
+    """
+    Interface for the pub/sub layer shared by `/update`, `/poll`, `/stream` and `/ws`.
+
+    Publishers hand a message to the broker; the broker stamps it with a per-channel
+    sequence number and delivers it to every worker's `deliver` callback, including the
+    publishing worker's own. Local state (event log, SSE hub, WebSocket rooms) is only
+    ever updated from `deliver`, so every worker sees the same events in the same order.
+    """
+
+    @abstractmethod
+    async def start(self, deliver: Deliver) -> None:
+        ...
+
+    @abstractmethod
+    async def stop(self) -> None:
+        ...
+
+    @abstractmethod
+    async def publish(self, channel: str, data: dict) -> dict:
+        """
+        Publish a message and return it as delivered (with its sequence number).
+        """
+
+
+class InMemoryBroker(Broker):
+    """
+    Single-process broker. Only correct when running one worker.
+    """
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+        self._seq: dict[str, int] = {}
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+    async def publish(self, channel: str, data: dict) -> dict:
+        seq = self._seq[channel] = self._seq.get(channel, 0) + 1
+        message = {"channel": channel, "seq": seq, "data": data}
+        if self._deliver is not None:
+            self._deliver(message)
+        return message
+
+
+class UnixSocketBroker(Broker):
+    """
+    Host-local broker that relays messages between workers over a Unix domain socket.
+
+    The first worker to start binds the socket and runs the relay; every worker,
+    including that one, connects to it as a client. The relay stamps each message with
+    the next per-channel sequence number, encodes it once and writes it to all clients
+    as a JSON line. If the relay's worker dies, the survivors reconnect and one of them
+    takes over the socket.
+
+    Sequence numbers carry on across a takeover, so SSE clients can resume with their
+    `Last-Event-ID`: the new relay starts from the highest sequence its worker has seen,
+    and every worker reports its own highest on (re)connecting, which the relay never
+    stamps below.
+
+    A worker that stops reading would make the relay buffer its frames without bound, so
+    once more than `max_buffer` bytes are waiting for it the relay drops the connection.
+    The worker then reconnects like after a relay failover.
+
+    Attributes:
+        path (str): Filesystem path of the relay socket.
+        max_buffer (int): Bytes the relay buffers for one worker before dropping it.
+    """
+
+    def __init__(self, path: str = "/tmp/push-broker.sock", max_buffer: int = 8 * 2**20):
+        self.path = path
+        self.max_buffer = max_buffer
+        self._deliver: Optional[Deliver] = None
+        self._relay: Optional[asyncio.AbstractServer] = None
+        self._lock = None
+        self._relay_clients: set[asyncio.StreamWriter] = set()
+        self._relay_seq: dict[str, int] = {}
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._last_seq: dict[str, int] = {}
+        self._connected = asyncio.Event()
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: dict[str, asyncio.Future] = {}
+        self._nonces = itertools.count()
+
+    # -------------------------------
+    # Relay (runs in one worker)
+    # -------------------------------
+    async def _serve_relay_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._relay_clients.add(writer)
+        try:
+            while line := await reader.readline():
+                try:
+                    message = json.loads(line)
+                    if "hello" in message:
+                        # A (re)connecting worker's highest sequence per channel
+                        for channel, seq in message["hello"].items():
+                            self._relay_seq[channel] = max(self._relay_seq.get(channel, 0), int(seq))
+                        continue
+                    channel = message["channel"]
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    continue
+                message["seq"] = self._relay_seq[channel] = self._relay_seq.get(channel, 0) + 1
+                frame = json.dumps(message).encode() + b"\n"
+                for client in list(self._relay_clients):
+                    if client.transport.get_write_buffer_size() > self.max_buffer:
+                        self._relay_clients.discard(client)
+                        client.close()
+                    else:
+                        client.write(frame)
+        except ConnectionError:
+            pass
+        finally:
+            self._relay_clients.discard(writer)
+            writer.close()
+
+    async def _become_relay(self) -> bool:
+        """
+        Try to take the relay role and bind the socket.
+
+        The role is guarded by an flock on a sibling lock file. The OS releases it when
+        the owning process dies, so a stale socket file is only replaced by the one
+        worker that wins the lock.
+
+        Returns:
+            bool: True if this worker is now the relay.
+        """
+        import fcntl  # Unix only, like AF_UNIX itself
+
+        lock = open(self.path + ".lock", "w")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock.close()
+            return False
+
+        self._lock = lock
+        self._relay_seq = dict(self._last_seq)
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        self._relay = await asyncio.start_unix_server(self._serve_relay_client, path=self.path)
+        return True
+
+    # -------------------------------
+    # Client (runs in every worker)
+    # -------------------------------
+    async def _connect(self) -> asyncio.StreamReader:
+        if self._writer is not None:
+            # The old connection is dead; release its transport before replacing it
+            self._writer.close()
+            self._writer = None
+        while True:
+            try:
+                reader, self._writer = await asyncio.open_unix_connection(self.path)
+                self._writer.write(json.dumps({"hello": self._last_seq}).encode() + b"\n")
+                return reader
+            except (FileNotFoundError, ConnectionRefusedError):
+                if self._relay is None and await self._become_relay():
+                    continue
+                # Another worker holds the relay role and is still binding
+                await asyncio.sleep(0.05)
+
+    async def _read_loop(self) -> None:
+        while True:
+            reader = await self._connect()
+            self._connected.set()
+            try:
+                while line := await reader.readline():
+                    try:
+                        message = json.loads(line)
+                    except ValueError:
+                        # One bad line must not kill the reader and with it all delivery
+                        continue
+                    future = self._pending.pop(message.pop("nonce", None), None)
+                    channel, seq = message.get("channel"), message.get("seq")
+                    if isinstance(seq, int) and seq > self._last_seq.get(channel, 0):
+                        self._last_seq[channel] = seq
+                    if self._deliver is not None:
+                        self._deliver(message)
+                    if future is not None and not future.done():
+                        future.set_result(message)
+            except ConnectionError:
+                pass
+            self._connected.clear()
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Broker relay connection lost"))
+            self._pending.clear()
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        self._reader_task = asyncio.create_task(self._read_loop())
+        await self._connected.wait()
+
+    async def stop(self) -> None:
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+        if self._relay is not None:
+            self._relay.close()
+            for client in list(self._relay_clients):
+                client.close()
+            self._lock.close()
+
+    async def publish(self, channel: str, data: dict) -> dict:
+        """
+        Send a message through the relay and wait for it to come back stamped.
+        """
+        await self._connected.wait()
+        nonce = f"{os.getpid()}:{next(self._nonces)}"
+        future = asyncio.get_running_loop().create_future()
+        self._pending[nonce] = future
+        try:
+            self._writer.write(json.dumps({"channel": channel, "nonce": nonce, "data": data}).encode() + b"\n")
+            # Wait out a full socket buffer instead of queueing publishes in memory
+            await self._writer.drain()
+            return await future
+        finally:
+            self._pending.pop(nonce, None)
+
+
+def create_broker(kind: Optional[str] = None, path: Optional[str] = None) -> Broker:
+    """
+    Build the broker selected by `kind` or the PUSH_BROKER environment variable.
+
+    Args:
+        kind (Optional[str]): "unix" (default where supported) or "memory".
+        path (Optional[str]): Relay socket path, defaults to PUSH_BROKER_PATH.
+
+    Returns:
+        Broker: The configured broker.
+    """
+    default = "unix" if hasattr(socket, "AF_UNIX") else "memory"
+    kind = kind or os.getenv("PUSH_BROKER", default)
+    if kind == "memory":
+        return InMemoryBroker()
+    if kind == "unix":
+        return UnixSocketBroker(path or os.getenv("PUSH_BROKER_PATH", "/tmp/push-broker.sock"))
+    raise ValueError(f"Unknown broker: {kind}")
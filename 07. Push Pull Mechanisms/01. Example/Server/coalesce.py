@@ -0,0 +1,54 @@
+import asyncio
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Coalescer(Generic[T]):
+    """
+    Merges items that arrive within a short window into one batch.
+
+    The first item after a flush starts a timer; everything added before it fires, or
+    until `max_batch` items are pending, is handed to `flush` in a single call. Under a
+    burst of updates subscribers are woken once per window instead of once per update,
+    at the cost of at most `window` seconds of extra latency.
+
+    Attributes:
+        window (float): Seconds to hold the first pending item before flushing.
+        max_batch (int): Pending items that trigger an immediate flush.
+        flushes (int): Number of batches flushed so far.
+        items (int): Number of items flushed so far.
+    """
+
+    def __init__(self, flush: Callable[[list[T]], None], window: float = 0.02, max_batch: int = 256):
+        self.window = window
+        self.max_batch = max_batch
+        self.flushes = 0
+        self.items = 0
+        self._flush = flush
+        self._pending: list[T] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def add(self, item: T) -> None:
+        """
+        Queue an item for the current window, flushing early if the batch is full.
+        """
+        self._pending.append(item)
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+
+    def flush(self) -> None:
+        """
+        Hand every pending item to the flush callback now.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            self.flushes += 1
+            self.items += len(batch)
+            self._flush(batch)
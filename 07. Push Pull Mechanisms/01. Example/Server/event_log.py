@@ -0,0 +1,126 @@
+import asyncio
+import time
+from collections import deque
+from itertools import islice
+from typing import Optional
+
+
+class EventLog:
+    """
+    Bounded, in-memory ring buffer of events with monotonically increasing sequence IDs.
+
+    Every appended event gets the next integer ID. Readers keep a cursor (the ID of the
+    last event they have seen) and ask for everything after it, so a burst of updates
+    is drained in one call instead of one call per update.
+
+    Attributes:
+        capacity (int): Maximum number of events retained before the oldest are evicted.
+        last_id (int): ID of the newest event (0 when the log is empty).
+        waiting (int): Readers currently parked in `wait_since`.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.last_id = 0
+        self.waiting = 0
+        self._events: deque[dict] = deque(maxlen=capacity)
+        self._new_event = asyncio.Event()
+
+    @property
+    def first_id(self) -> int:
+        """
+        ID of the oldest event still retained (last_id + 1 when the log is empty).
+        """
+        return self.last_id - len(self._events) + 1
+
+    def append(self, message: str, event_id: Optional[int] = None,
+               timestamp: Optional[float] = None) -> dict:
+        """
+        Append a message to the log and wake every waiting reader.
+
+        The wait event is swapped for a fresh one rather than set and cleared back to
+        back, so readers that are scheduled late still observe the wakeup.
+
+        Args:
+            message (str): Payload of the event.
+            event_id (Optional[int]): ID assigned upstream (e.g. by the broker). Defaults
+                to the next local ID. If it skips ahead, the retained events are dropped
+                so older cursors are told to resync instead of silently missing the gap.
+            timestamp (Optional[float]): Event time, defaults to now.
+
+        Returns:
+            dict: The stored event with its id, message and timestamp.
+        """
+        event = self._store(message, event_id, timestamp)
+        self._wake()
+        return event
+
+    def extend(self, entries: list[tuple[str, Optional[int], Optional[float]]]) -> list[dict]:
+        """
+        Append a batch of (message, event_id, timestamp) entries with a single wakeup.
+
+        Returns:
+            list[dict]: The stored events, in order.
+        """
+        events = [self._store(message, event_id, timestamp) for message, event_id, timestamp in entries]
+        if events:
+            self._wake()
+        return events
+
+    def _store(self, message: str, event_id: Optional[int], timestamp: Optional[float]) -> dict:
+        if event_id is None:
+            event_id = self.last_id + 1
+        elif event_id != self.last_id + 1:
+            self._events.clear()
+
+        self.last_id = event_id
+        event = {"id": event_id, "message": message, "timestamp": timestamp or time.time()}
+        self._events.append(event)
+        return event
+
+    def _wake(self) -> None:
+        waiters, self._new_event = self._new_event, asyncio.Event()
+        waiters.set()
+
+    def since(self, cursor: int) -> tuple[list[dict], bool]:
+        """
+        Return every retained event newer than the cursor.
+
+        Args:
+            cursor (int): ID of the last event the reader has seen.
+
+        Returns:
+            tuple[list[dict], bool]: The missed events, and a resync flag that is True when
+            events after the cursor were already evicted (or the cursor is from the future,
+            e.g. after a server restart) and the reader must resynchronise.
+        """
+        if cursor > self.last_id:
+            return [], True
+
+        start = cursor - self.first_id + 1
+        if start < 0:
+            return list(self._events), True
+
+        return list(islice(self._events, start, None)), False
+
+    async def wait_since(self, cursor: int, timeout: float) -> tuple[list[dict], bool]:
+        """
+        Like `since`, but park until at least one event newer than the cursor exists.
+
+        Args:
+            cursor (int): ID of the last event the reader has seen.
+            timeout (float): Seconds to wait before returning an empty batch.
+
+        Returns:
+            tuple[list[dict], bool]: The missed events and the resync flag.
+        """
+        if cursor == self.last_id:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._new_event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return [], False
+            finally:
+                self.waiting -= 1
+
+        return self.since(cursor)
@@ -0,0 +1,55 @@
+import asyncio
+from collections import deque
+from typing import Any, Optional
+
+
+class FrameQueue:
+    """
+    Bounded FIFO of outgoing frames for exactly one consumer.
+
+    A trimmed-down `asyncio.Queue`: one deque and at most one pending waiter future,
+    instead of separate getter, putter and item deques plus a `join` event. Producers
+    never block (the hubs check `full()` and apply their own overflow policy), so there
+    is nothing to track on the put side. This keeps the per-connection cost of parked
+    SSE and WebSocket clients small.
+    """
+    __slots__ = ("maxsize", "_frames", "_waiter")
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._frames: deque = deque()
+        self._waiter: Optional[asyncio.Future] = None
+
+    def qsize(self) -> int:
+        return len(self._frames)
+
+    def empty(self) -> bool:
+        return not self._frames
+
+    def full(self) -> bool:
+        return len(self._frames) >= self.maxsize
+
+    def clear(self) -> None:
+        self._frames.clear()
+
+    def put_nowait(self, frame: Any) -> None:
+        if self.full():
+            raise asyncio.QueueFull
+        self._frames.append(frame)
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def get_nowait(self) -> Any:
+        if not self._frames:
+            raise asyncio.QueueEmpty
+        return self._frames.popleft()
+
+    async def get(self) -> Any:
+        while not self._frames:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self._frames.popleft()
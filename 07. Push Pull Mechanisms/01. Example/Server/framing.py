@@ -0,0 +1,72 @@
+import base64
+import json
+from typing import Any, Optional, Union
+
+import msgpack
+
+JSON = "json"
+MSGPACK = "msgpack"
+FORMATS = (JSON, MSGPACK)
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+def accept_qualities(accept: str) -> dict[str, float]:
+    """
+    Parse an HTTP Accept header into {media range: quality}; `q` defaults to 1.
+    """
+    qualities: dict[str, float] = {}
+    for media_range in accept.split(","):
+        media_type, *params = (part.strip() for part in media_range.split(";"))
+        if not media_type:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[media_type.lower()] = max(quality, qualities.get(media_type.lower(), 0.0))
+    return qualities
+
+
+def accepts_msgpack(accept: Optional[str]) -> bool:
+    """
+    True if an HTTP Accept header asks for msgpack: one of its media types is listed
+    with a non-zero quality (`q=0` means "not acceptable") that is not below JSON's.
+    Wildcards keep the JSON default.
+    """
+    if not accept:
+        return False
+    qualities = accept_qualities(accept)
+    msgpack_quality = max((qualities.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES))
+    return msgpack_quality > 0 and msgpack_quality >= qualities.get("application/json", 0.0)
+
+
+def encode(fmt: str, obj: Any) -> Union[str, bytes]:
+    """
+    Encode an object as a JSON text frame or a msgpack binary frame.
+    """
+    if fmt == MSGPACK:
+        return msgpack.packb(obj, use_bin_type=True)
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def decode(raw: Union[str, bytes]) -> Any:
+    """
+    Decode a frame produced by `encode`; binary frames are msgpack, text frames JSON.
+    """
+    if isinstance(raw, bytes):
+        return msgpack.unpackb(raw, raw=False)
+    return json.loads(raw)
+
+
+def encode_sse_data(fmt: str, data: str) -> str:
+    """
+    SSE is a text protocol, so msgpack payloads are carried base64-encoded.
+    """
+    if fmt == MSGPACK:
+        return base64.b64encode(msgpack.packb(data, use_bin_type=True)).decode()
+    return data
@@ -0,0 +1,70 @@
+import json
+import random
+import timeit
+import zlib
+
+from colorama import Fore, init
+
+from broadcast import encode_sse
+from framing import FORMATS, encode
+
+init(autoreset=True)
+
+
+def make_event(n_ticks: int) -> dict:
+    """
+    A market-data style event whose size scales with `n_ticks`.
+    """
+    rng = random.Random(n_ticks)
+    ticks = [
+        {"symbol": rng.choice(["AAPL", "MSFT", "GOOG", "AMZN"]), "price": round(rng.uniform(100, 500), 2),
+         "size": rng.randint(1, 1000), "ts": 1_700_000_000 + i}
+        for i in range(n_ticks)
+    ]
+    return {"type": "message", "room": "updates", "message": {"ticks": ticks}}
+
+
+def deflate(frame: bytes) -> bytes:
+    """
+    Compress one message the way permessage-deflate does (raw deflate, sync flush,
+    trailing 0x00 0x00 0xff 0xff removed), using a fresh context per message.
+    """
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return (compressor.compress(frame) + compressor.flush(zlib.Z_SYNC_FLUSH))[:-4]
+
+
+def measure(obj: dict, fmt: str, number: int = 2000) -> dict:
+    """
+    Bytes per event on the WebSocket (plain and deflated) and on SSE, plus encode and
+    deflate CPU per event, for one payload in one format.
+    """
+    frame = encode(fmt, obj)
+    raw = frame if isinstance(frame, bytes) else frame.encode()
+    return {
+        "bytes": len(raw),
+        "deflated": len(deflate(raw)),
+        "sse": len(encode_sse(json.dumps(obj["message"]), event_id=1, fmt=fmt)),
+        "encode_us": timeit.timeit(lambda: encode(fmt, obj), number=number) / number * 1e6,
+        "deflate_us": timeit.timeit(lambda: deflate(raw), number=number) / number * 1e6,
+    }
+
+
+if __name__ == "__main__":
+    # Smallest WebSocket frame (per format) where deflate saves at least 10%
+    thresholds: dict[str, int] = {}
+
+    print(Fore.BLUE + f"{'ticks':>6} {'format':<8} {'ws bytes':>9} {'deflated':>9} {'ratio':>6} {'sse bytes':>10} {'encode us':>10} {'deflate us':>11}")
+    for n_ticks in (1, 4, 16, 64, 256):
+        event = make_event(n_ticks)
+        for fmt in FORMATS:
+            result = measure(event, fmt)
+            ratio = result["deflated"] / result["bytes"]
+            if ratio <= 0.9:
+                thresholds.setdefault(fmt, result["bytes"])
+            print(
+                f"{n_ticks:>6} {fmt:<8} {result['bytes']:>9} {result['deflated']:>9} {ratio:>6.2f}"
+                f" {result['sse']:>10} {result['encode_us']:>10.2f} {result['deflate_us']:>11.2f}"
+            )
+
+    for fmt in FORMATS:
+        print(f"{fmt}: permessage-deflate pays off from ~{thresholds.get(fmt, 'n/a')} bytes per message")
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import sys
+import time
+from typing import Optional
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+
+def rss_bytes() -> Optional[int]:
+    """
+    Current resident set size of this process.
+
+    Reads /proc on Linux; elsewhere falls back to the peak RSS from getrusage, and
+    returns None where neither exists (Windows).
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: how late a periodic sleep wakes up.
+
+    A loop busy with callbacks (encoding, fan-out, thousands of wakeups) delays every
+    coroutine by the same amount, so the overshoot of one cheap `sleep` is a good proxy
+    for the scheduling latency all connections see.
+
+    Attributes:
+        interval (float): Seconds between samples.
+        last (float): Lag of the latest sample, in seconds.
+        peak (float): Largest lag since the last `read_peak`, in seconds.
+    """
+    __slots__ = ("interval", "last", "peak")
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.last = 0.0
+        self.peak = 0.0
+
+    async def run(self) -> None:
+        """
+        Sample forever; meant to run as one background task.
+        """
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.last = max(0.0, time.perf_counter() - start - self.interval)
+            self.peak = max(self.peak, self.last)
+
+    def read_peak(self) -> float:
+        """
+        Return the peak lag and start a new measurement window.
+        """
+        peak, self.peak = self.peak, self.last
+        return peak
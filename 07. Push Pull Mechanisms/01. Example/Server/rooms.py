@@ -0,0 +1,270 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional, Union
+
+from fastapi import WebSocket, WebSocketDisconnect
+from starlette.websockets import WebSocketState
+
+from frame_queue import FrameQueue
+from framing import FORMATS, JSON, decode, encode
+
+logger = logging.getLogger(__name__)
+
+# Close code sent to a client whose send queue overflowed (RFC 6455 "Try Again Later")
+CLOSE_SLOW_CONSUMER = 1013
+# Close code sent to a client that stopped answering pings ("Going Away")
+CLOSE_IDLE = 1001
+
+
+class Connection:
+    """
+    Per-socket state: a bounded queue of pre-encoded frames and the rooms it has joined.
+    """
+    __slots__ = ("websocket", "fmt", "queue", "rooms", "last_seen", "pinged")
+
+    def __init__(self, websocket: WebSocket, fmt: str, maxsize: int):
+        self.websocket = websocket
+        self.fmt = fmt
+        # Holds encoded frames, or an int close code telling the writer to hang up
+        self.queue = FrameQueue(maxsize)
+        self.rooms: set[str] = set()
+        self.last_seen = time.monotonic()
+        self.pinged = False
+
+
+class RoomHub:
+    """
+    Multiplexed WebSocket pub/sub hub with named rooms.
+
+    Each socket has one reader (the endpoint coroutine) and one writer task draining a
+    bounded send queue, so a slow client never blocks a publisher: when its queue is full
+    it is closed with 1013. A single sweeper task pings idle sockets and closes the ones
+    that stay silent, instead of running one timer per connection.
+
+    Client protocol (JSON text frames, or msgpack binary frames when the client asks
+    for the "msgpack" subprotocol):
+        {"action": "subscribe", "room": "news"}
+        {"action": "unsubscribe", "room": "news"}
+        {"action": "publish", "room": "news", "message": "hello"}
+        {"action": "pong"}
+
+    Server frames are {"type": "message", "room", "message"}, {"type": "batch", "room",
+    "messages"} when updates were coalesced, {"type": "ping"} and {"type": "error"}.
+
+    Attributes:
+        queue_size (int): Maximum frames buffered per connection.
+        ping_interval (float): Idle seconds before the server sends a ping.
+        idle_timeout (float): Idle seconds before a silent connection is closed.
+        publisher (Optional[Callable]): Coroutine that client publishes are routed through
+            (e.g. a cross-worker broker that later calls `publish` on every worker).
+            Defaults to publishing locally.
+    """
+
+    def __init__(self, queue_size: int = 64, ping_interval: float = 20, idle_timeout: float = 60,
+                 publisher: Optional[Callable[[str, str], Awaitable]] = None):
+        self.queue_size = queue_size
+        self.publisher = publisher
+        self.ping_interval = ping_interval
+        self.idle_timeout = idle_timeout
+        self.rooms: dict[str, set[Connection]] = {}
+        self.connections: set[Connection] = set()
+
+    # -------------------------------
+    # Publishing
+    # -------------------------------
+    def publish(self, room: str, message: str) -> int:
+        """
+        Encode a message once per format in use and enqueue the same frame for every
+        member of the room that speaks that format.
+
+        Args:
+            room (str): Room name.
+            message (str): Payload to broadcast.
+
+        Returns:
+            int: Number of connections the frame was queued for.
+        """
+        return self._broadcast(room, {"type": "message", "room": room, "message": message})
+
+    def _broadcast(self, room: str, payload: dict) -> int:
+        members = self.rooms.get(room)
+        if not members:
+            return 0
+
+        frames: dict[str, Union[str, bytes]] = {}
+        for connection in list(members):
+            frame = frames.get(connection.fmt)
+            if frame is None:
+                frame = frames[connection.fmt] = encode(connection.fmt, payload)
+            self._offer(connection, frame)
+        return len(members)
+
+    def publish_many(self, room: str, messages: list[str]) -> int:
+        """
+        Broadcast several messages to a room as a single batch frame.
+
+        Returns:
+            int: Number of connections the frame was queued for.
+        """
+        if len(messages) == 1:
+            return self.publish(room, messages[0])
+        return self._broadcast(room, {"type": "batch", "room": room, "messages": messages})
+
+    def _send(self, connection: Connection, payload: Any) -> None:
+        """
+        Encode a one-off frame (error, ping) for a single connection.
+        """
+        self._offer(connection, encode(connection.fmt, payload))
+
+    def _offer(self, connection: Connection, frame: Union[str, bytes]) -> None:
+        """
+        Enqueue a frame, closing the connection if its send queue is full.
+        """
+        if connection.queue.full():
+            self._evict(connection, CLOSE_SLOW_CONSUMER)
+            return
+        connection.queue.put_nowait(frame)
+
+    def _evict(self, connection: Connection, code: int) -> None:
+        """
+        Detach a connection and hand its writer the close code in place of its backlog.
+        """
+        self._leave_all(connection)
+        connection.queue.clear()
+        connection.queue.put_nowait(code)
+
+    # -------------------------------
+    # Membership
+    # -------------------------------
+    def subscribe(self, connection: Connection, room: str) -> None:
+        self.rooms.setdefault(room, set()).add(connection)
+        connection.rooms.add(room)
+
+    def unsubscribe(self, connection: Connection, room: str) -> None:
+        members = self.rooms.get(room)
+        if members is not None:
+            members.discard(connection)
+            if not members:
+                del self.rooms[room]
+        connection.rooms.discard(room)
+
+    def _leave_all(self, connection: Connection) -> None:
+        for room in list(connection.rooms):
+            self.unsubscribe(connection, room)
+        self.connections.discard(connection)
+
+    # -------------------------------
+    # Connection lifecycle
+    # -------------------------------
+    async def _writer(self, connection: Connection) -> None:
+        """
+        Drain the send queue onto the socket; awaiting each send applies TCP backpressure.
+        """
+        websocket = connection.websocket
+        while True:
+            frame = await connection.queue.get()
+            if isinstance(frame, int):
+                if websocket.application_state == WebSocketState.CONNECTED:
+                    await websocket.close(code=frame)
+                return
+            if isinstance(frame, bytes):
+                await websocket.send_bytes(frame)
+            else:
+                await websocket.send_text(frame)
+
+    async def _handle(self, connection: Connection, raw: Union[str, bytes]) -> None:
+        """
+        Apply one client command.
+        """
+        try:
+            command = decode(raw)
+            action = command["action"]
+        except (ValueError, KeyError, TypeError):
+            self._send(connection, {"type": "error", "message": "Malformed command"})
+            return
+
+        if action == "pong":
+            return
+        if action not in ("subscribe", "unsubscribe", "publish"):
+            self._send(connection, {"type": "error", "message": f"Unknown action {action}"})
+            return
+
+        # Validate before touching the room maps: a missing or unhashable room must not
+        # raise out of the reader and kill the socket
+        room = command.get("room")
+        if not isinstance(room, str):
+            self._send(connection, {"type": "error", "message": f"{action} needs a string room"})
+            return
+
+        if action == "subscribe":
+            self.subscribe(connection, room)
+        elif action == "unsubscribe":
+            self.unsubscribe(connection, room)
+        else:
+            message = command.get("message", "")
+            if not isinstance(message, str):
+                self._send(connection, {"type": "error", "message": "publish needs a string message"})
+                return
+            if self.publisher is not None:
+                await self.publisher(room, message)
+            else:
+                self.publish(room, message)
+
+    def _writer_done(self, connection: Connection, task: asyncio.Task) -> None:
+        """
+        Retrieve the writer's outcome. A failed send means the socket is unusable, so the
+        connection is detached and publishers stop queueing frames for it.
+        """
+        if task.cancelled() or task.exception() is None:
+            return
+        self._leave_all(connection)
+        logger.info("WebSocket writer stopped: %r", task.exception())
+
+    async def serve(self, websocket: WebSocket) -> None:
+        """
+        Run one WebSocket connection until the client disconnects or is evicted.
+
+        Args:
+            websocket (WebSocket): The incoming socket; it is accepted here.
+        """
+        # Honour the first subprotocol we support, e.g. `Sec-WebSocket-Protocol: msgpack`
+        requested = websocket.scope.get("subprotocols", [])
+        fmt = next((protocol for protocol in requested if protocol in FORMATS), None)
+        await websocket.accept(subprotocol=fmt)
+
+        connection = Connection(websocket, fmt or JSON, self.queue_size)
+        self.connections.add(connection)
+        writer = asyncio.create_task(self._writer(connection))
+        writer.add_done_callback(lambda task: self._writer_done(connection, task))
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                connection.last_seen = time.monotonic()
+                connection.pinged = False
+                await self._handle(connection, message.get("bytes") or message.get("text") or "")
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+        finally:
+            self._leave_all(connection)
+            writer.cancel()
+
+    async def sweep(self) -> None:
+        """
+        Periodically ping idle connections and evict the ones past the idle timeout.
+
+        Meant to run as one background task for the whole hub.
+        """
+        pings = {fmt: encode(fmt, {"type": "ping"}) for fmt in FORMATS}
+        while True:
+            await asyncio.sleep(self.ping_interval / 2)
+            now = time.monotonic()
+            for connection in list(self.connections):
+                idle = now - connection.last_seen
+                if idle >= self.idle_timeout:
+                    self._evict(connection, CLOSE_IDLE)
+                elif idle >= self.ping_interval and not connection.pinged:
+                    connection.pinged = True
+                    self._offer(connection, pings[connection.fmt])
@@ -1,15 +1,104 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request, Header
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
 from colorama import Fore, init
 from pydantic import BaseModel
+from event_log import EventLog
+from broadcast import BroadcastHub
+from rooms import RoomHub
+from broker import create_broker
+from coalesce import Coalescer
+from loop_stats import LoopLagMonitor, rss_bytes
+from framing import JSON, MSGPACK, accepts_msgpack, encode
+from contextlib import asynccontextmanager
+from typing import Optional
 import time
+import os
 
 
 init(autoreset=True)
 
-app = FastAPI()
+# Ring buffer of the most recent updates, each tagged with the broker's sequence ID
+event_log = EventLog(capacity=1024)
+
+# Shared fan-out for /stream: one encode per event, bounded queue per subscriber
+sse_hub = BroadcastHub(queue_size=256, replay_size=1024, policy="drop_oldest")
+
+# Cross-worker pub/sub: every worker receives every message through `deliver`.
+# Select the backend with PUSH_BROKER=unix|memory (see broker.py).
+broker = create_broker()
+
+
+async def publish_to_room(room: str, message: str):
+    await broker.publish("rooms", {"room": room, "message": message})
+
+
+# WebSocket pub/sub rooms; /update is also broadcast to the "updates" room
+ws_hub = RoomHub(queue_size=64, ping_interval=20, idle_timeout=60, publisher=publish_to_room)
+
+
+# Event-loop lag, reported by /stats alongside RSS and connection counts
+loop_lag = LoopLagMonitor(interval=0.05)
+
+
+def apply_updates(messages: list[dict]):
+    """
+    Store a batch of "updates" broker messages and notify every subscriber once.
+    """
+    events = event_log.extend([
+        (message["data"]["message"], message["seq"], message["data"]["timestamp"]) for message in messages
+    ])
+    sse_hub.publish_many([(event["message"], event["id"]) for event in events])
+    ws_hub.publish_many("updates", [event["message"] for event in events])
+
+
+# Optional coalescing of bursty /update traffic: PUSH_COALESCE_MS=5..50 merges the updates
+# of one window into a single wakeup, at most PUSH_COALESCE_MAX updates per batch
+coalesce_ms = float(os.getenv("PUSH_COALESCE_MS", "0"))
+coalescer = Coalescer(apply_updates, window=coalesce_ms / 1000,
+                      max_batch=int(os.getenv("PUSH_COALESCE_MAX", "256"))) if coalesce_ms > 0 else None
+
+
+def deliver(message: dict):
+    """
+    Apply a broker message to this worker's local state and subscribers.
+    """
+    data = message["data"]
+    if message["channel"] == "updates":
+        if coalescer is not None:
+            coalescer.add(message)
+        else:
+            apply_updates([message])
+    elif message["channel"] == "rooms":
+        ws_hub.publish(data["room"], data["message"])
+
+
+async def server_clock():
+    """
+    Single producer that publishes the server time to every SSE subscriber once a second.
+    """
+    while True:
+        await asyncio.sleep(1)
+        sse_hub.publish(f"Server time: {time.ctime()}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await broker.start(deliver)
+    clock = asyncio.create_task(server_clock())
+    sweeper = asyncio.create_task(ws_hub.sweep())
+    lag_monitor = asyncio.create_task(loop_lag.run())
+    yield
+    clock.cancel()
+    sweeper.cancel()
+    lag_monitor.cancel()
+    await broker.stop()
+    if coalescer is not None:
+        coalescer.flush()
+
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -18,58 +107,88 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-event = asyncio.Event()
-latest_data = {"message": "Initial message", "timestamp": time.time()}
-
 @app.get("/")
 async def home():
     return {"ping": "pong"}
 
+@app.get("/stats")
+async def stats():
+    """
+    Capacity counters for this worker: RSS, event-loop lag and parked connections.
+    """
+    return {
+        "pid": os.getpid(),
+        "rss": rss_bytes(),
+        "loop_lag_ms": {"last": loop_lag.last * 1000, "peak": loop_lag.read_peak() * 1000},
+        "connections": {"poll": event_log.waiting, "sse": len(sse_hub), "ws": len(ws_hub.connections)},
+    }
+
 class Data(BaseModel):
     message: str
 
 @app.post("/update")
 async def update(request: Request, data:Data):
-    latest_data["message"] = data.message
-    latest_data["timestamp"] = time.time()
-    event.set()
-    event.clear()
-    return {"status":"updated"}
+    message = await broker.publish("updates", {"message": data.message, "timestamp": time.time()})
+    return {"status":"updated", "id": message["seq"]}
 
 
 @app.get("/poll")
-async def poll(last_seen: float = 0):
+async def poll(cursor: int = 0, accept: Optional[str] = Header(None)):
+    """
+    Long-poll for every event after `cursor` (the ID of the last event the client saw).
+
+    Returns all missed events in one batch. `resync` is True when the cursor has already
+    been evicted from the log, meaning some events were lost and the client should reload
+    its state before continuing from the returned `cursor`. Send
+    `Accept: application/msgpack` to get the batch as msgpack instead of JSON.
+    """
     timeout = 15
-    if latest_data["timestamp"] <= last_seen:
-        try:
-            await asyncio.wait_for(event.wait(), timeout)
-        except asyncio.TimeoutError:
-            return JSONResponse(content={"message": None, "timestamp": last_seen})
-        
-    return JSONResponse(content={
-        "message": latest_data["message"],
-        "timestamp": latest_data["timestamp"]
-    })
-
-async def server_sent_events():    
-    while True:
-        await asyncio.sleep(1)
-        yield f"data: Server time: {time.ctime()}\n\n"
-        
+    events, resync = await event_log.wait_since(cursor, timeout)
+
+    if events:
+        cursor = events[-1]["id"]
+    elif resync:
+        cursor = event_log.last_id
+
+    content = {"events": events, "cursor": cursor, "resync": resync}
+    if accepts_msgpack(accept):
+        return Response(encode(MSGPACK, content), media_type="application/msgpack")
+    return JSONResponse(content=content)
+
 @app.get("/stream")
-async def stream():
-    return StreamingResponse(server_sent_events(), media_type="text/event-stream") 
+async def stream(last_event_id: Optional[int] = Header(None), encoding: str = JSON):
+    """
+    Subscribe to the shared SSE feed. Reconnecting clients send `Last-Event-ID`
+    and get every buffered update after it before the live events.
+    With `?encoding=msgpack` each `data:` field is base64-encoded msgpack.
+    """
+    if encoding not in (JSON, MSGPACK):
+        return JSONResponse(status_code=400, content={"detail": f"Unsupported encoding {encoding}"})
+    return StreamingResponse(sse_hub.stream(last_event_id, encoding), media_type="text/event-stream") 
 
 
 @app.websocket("/ws")
 async def connect_websocket(websocket: WebSocket):
-    await websocket.accept()
-    try:
-        while True:
-            data = await websocket.receive_text()
-            print(Fore.BLUE + f"Client >> {data}")
-            text = input("Server >> ")
-            await websocket.send_text(text)
-            
-    except WebSocketDisconnect:
-        print("Client disconnected")
\ No newline at end of file
+    """
+    Multiplexed pub/sub socket: clients subscribe to named rooms and publish to them.
+    See `RoomHub` for the command protocol. Request the "msgpack" subprotocol for
+    binary msgpack frames.
+    """
+    await ws_hub.serve(websocket)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    from ws_deflate import ThresholdDeflateProtocol
+
+    # permessage-deflate on /ws: PUSH_WS_DEFLATE=0 turns it off, PUSH_WS_DEFLATE_MIN_SIZE
+    # sets the smallest message worth compressing (measure with framing_benchmark.py)
+    uvicorn.run(
+        "server:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WORKERS", "1")),
+        ws=ThresholdDeflateProtocol,
+        ws_per_message_deflate=os.getenv("PUSH_WS_DEFLATE", "1") == "1",
+    )
\ No newline at end of file
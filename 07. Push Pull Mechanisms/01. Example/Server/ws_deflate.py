@@ -0,0 +1,68 @@
+import os
+from typing import Sequence
+
+from uvicorn.protocols.websockets.websockets_impl import WebSocketProtocol
+from websockets.extensions.base import Extension
+from websockets.extensions.permessage_deflate import ServerPerMessageDeflateFactory
+from websockets.frames import CTRL_OPCODES, OP_CONT, Frame
+from websockets.typing import ExtensionName, ExtensionParameter
+
+# Messages smaller than this are sent uncompressed (see framing_benchmark.py for the numbers)
+DEFLATE_MIN_SIZE = int(os.getenv("PUSH_WS_DEFLATE_MIN_SIZE", "256"))
+
+
+class ThresholdDeflate(Extension):
+    """
+    permessage-deflate that only compresses messages of at least `min_size` bytes.
+
+    RFC 7692 lets the sender leave any message uncompressed (RSV1 unset), so small frames
+    skip the deflate CPU and the compressor's shared window is left untouched.
+    """
+
+    def __init__(self, deflate: Extension, min_size: int):
+        self.deflate = deflate
+        self.min_size = min_size
+        # Decision for the message being sent, reused for its continuation frames
+        self._compress = True
+
+    @property
+    def name(self) -> ExtensionName:
+        return self.deflate.name
+
+    def decode(self, frame: Frame, *, max_size=None) -> Frame:
+        return self.deflate.decode(frame, max_size=max_size)
+
+    def encode(self, frame: Frame) -> Frame:
+        if frame.opcode in CTRL_OPCODES:
+            return frame
+        if frame.opcode is not OP_CONT:
+            self._compress = len(frame.data) >= self.min_size
+        return self.deflate.encode(frame) if self._compress else frame
+
+
+class ThresholdDeflateFactory(ServerPerMessageDeflateFactory):
+    """
+    Negotiates permessage-deflate as usual and wraps the result in `ThresholdDeflate`.
+    """
+
+    def __init__(self, min_size: int = DEFLATE_MIN_SIZE, **kwargs):
+        super().__init__(**kwargs)
+        self.min_size = min_size
+
+    def process_request_params(self, params: Sequence[ExtensionParameter],
+                               accepted_extensions: Sequence[Extension]):
+        response_params, deflate = super().process_request_params(params, accepted_extensions)
+        return response_params, ThresholdDeflate(deflate, self.min_size)
+
+
+class ThresholdDeflateProtocol(WebSocketProtocol):
+    """
+    uvicorn's websockets protocol with the size-aware deflate extension.
+
+    Pass the class as `ws=` to uvicorn; `ws_per_message_deflate` still switches it off.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.config.ws_per_message_deflate:
+            self.available_extensions = [ThresholdDeflateFactory()]